@@ -1,14 +1,15 @@
 import os
 import sys
 import json
+import threading
 from flask import Flask, request, jsonify
 from flask_cors import CORS
 import numpy as np
 from datetime import datetime, timedelta
-from config import FLASK_ENV
+from config import FLASK_ENV, WEATHER_PREFETCH
 from crop_database import CropDatabase
 from financial_calculator import FinancialCalculator
-from models.stress_predictor import StressPredictor
+from models.stress_predictor import get_predictor
 from satellite_fetch import SatelliteFetcher
 from ndvi_processor import NDVIProcessor
 from stress_analyzer import StressAnalyzer
@@ -31,6 +32,10 @@ except ImportError:
 app = Flask(__name__)
 CORS(app)
 
+# Serialize JSON responses with orjson when available
+from json_provider import init_json_provider
+init_json_provider(app)
+
 # Database configuration
 app.config['SQLALCHEMY_DATABASE_URI'] = os.getenv('DATABASE_URL', 'sqlite:///aquaadvisor.db')
 
@@ -90,7 +95,7 @@ recommendation_engine = RecommendationEngine()
 
 # Initialize ML stress predictor and train on startup for faster first request
 print("Initializing ML stress predictor...")
-stress_predictor = StressPredictor()
+stress_predictor = get_predictor()
 if stress_predictor.model is None:
     print("Pre-training ML model for faster responses...")
     import threading
@@ -101,9 +106,31 @@ if stress_predictor.model is None:
     thread.daemon = True
     thread.start()
 
+def prefetch_farm_weather():
+    """Keep weather warm for registered farm centers so analyses hit the cache."""
+    from models.farm import Farm
+    try:
+        with app.app_context():
+            boundaries = [row[0] for row in db.session.query(Farm.boundary_coordinates).all()]
+        
+        farm_coords = []
+        for coords in boundaries:
+            if isinstance(coords, str):
+                coords = json.loads(coords)
+            if coords:
+                farm_coords.append((
+                    sum(c[0] for c in coords) / len(coords),
+                    sum(c[1] for c in coords) / len(coords)
+                ))
+        
+        if farm_coords:
+            weather_service.start_prefetcher(farm_coords)
+    except Exception as e:
+        print(f"Weather prefetch setup failed: {e}")
+
 def get_stress_predictor():
-    """Get the stress predictor instance."""
-    return stress_predictor
+    """Get the shared stress predictor instance."""
+    return get_predictor()
 
 @app.route('/api/health', methods=['GET'])
 def health_check():
@@ -836,4 +863,7 @@ def subdivide_polygon_fallback(boundary_coords, num_zones):
         }]
 
 if __name__ == '__main__':
+    # Start once per server: under the debug reloader only in the serving child
+    if WEATHER_PREFETCH and (FLASK_ENV != 'development' or os.environ.get('WERKZEUG_RUN_MAIN') == 'true'):
+        threading.Thread(target=prefetch_farm_weather, daemon=True).start()
     app.run(host='0.0.0.0', port=5002, debug=(FLASK_ENV == 'development'))
\ No newline at end of file
@@ -11,6 +11,10 @@ from config import FLASK_ENV
 app = Flask(__name__)
 CORS(app)
 
+# Serialize JSON responses with orjson when available
+from json_provider import init_json_provider
+init_json_provider(app)
+
 # Database configuration
 app.config['SQLALCHEMY_DATABASE_URI'] = os.getenv('DATABASE_URL', 'sqlite:///aquaadvisor.db')
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
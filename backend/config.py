@@ -28,4 +28,5 @@ NDVI_MODERATE = 0.6
 NDVI_HEALTHY = 0.6
 
 # Application Settings
-FLASK_ENV = os.getenv('FLASK_ENV', 'development')
\ No newline at end of file
+FLASK_ENV = os.getenv('FLASK_ENV', 'development')
+WEATHER_PREFETCH = os.getenv('WEATHER_PREFETCH', 'False') == 'True'  # Warm weather cache for registered farms
\ No newline at end of file
@@ -11,9 +11,10 @@ farms_bp = Blueprint('farms', __name__)
 @farms_bp.route('/my-farms', methods=['GET'])
 @token_required
 def get_my_farms(current_user):
-    """Get all farms for the current user"""
+    """Get all farms for the current user (?summary=true omits boundaries)"""
     try:
-        farms = get_user_farms(current_user.id)
+        summary = request.args.get('summary', 'false').lower() == 'true'
+        farms = get_user_farms(current_user.id, summary=summary)
         return jsonify({'farms': farms}), 200
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -1,6 +1,10 @@
 from models.database import db
 from models.farm import Farm
 from sqlalchemy import or_
+from sqlalchemy.orm import load_only, undefer
+
+# Columns needed by Farm.to_summary_dict()
+SUMMARY_COLUMNS = (Farm.id, Farm.farm_name, Farm.area_hectares, Farm.verification_status)
 
 def create_farm(user_id, farm_data):
     """Create a new farm"""
@@ -22,14 +26,28 @@ def create_farm(user_id, farm_data):
         db.session.rollback()
         return None, str(e)
 
-def get_user_farms(user_id):
-    """Get all farms for a user"""
-    farms = Farm.query.filter_by(user_id=user_id).order_by(Farm.created_at.desc()).all()
-    return [farm.to_dict() for farm in farms]
+def get_user_farms(user_id, summary=False):
+    """Get all farms for a user
+    
+    Args:
+        user_id: User ID
+        summary: Return lightweight summaries without boundaries
+    """
+    query = Farm.query.filter_by(user_id=user_id).order_by(Farm.created_at.desc())
+    
+    if summary:
+        farms = query.options(load_only(*SUMMARY_COLUMNS)).all()
+        return [farm.to_summary_dict() for farm in farms]
+    
+    # Full dicts include boundaries; load them in the same query
+    farms = query.options(undefer(Farm.boundary_coordinates)).all()
+    return Farm.bulk_to_dicts(farms)
 
 def get_farm_by_id(farm_id, user_id):
     """Get a specific farm"""
-    farm = Farm.query.filter_by(id=farm_id, user_id=user_id).first()
+    farm = Farm.query.options(undefer(Farm.boundary_coordinates)).filter_by(
+        id=farm_id, user_id=user_id
+    ).first()
     return farm
 
 def update_farm(farm_id, user_id, farm_data):
@@ -86,7 +104,7 @@ def search_farms(user_id, query, search_type='name'):
     if search_type == 'registration':
         # For registration/survey search, search ALL farms (not just user's)
         # This allows discovering existing farms by survey number
-        farms = Farm.query.filter(
+        farms = Farm.query.options(undefer(Farm.boundary_coordinates)).filter(
             or_(
                 Farm.registration_number.ilike(search_pattern),
                 Farm.survey_number.ilike(search_pattern)
@@ -94,12 +112,12 @@ def search_farms(user_id, query, search_type='name'):
         ).all()
     elif search_type == 'location':
         # Search by location fields - search all farms
-        farms = Farm.query.filter(
+        farms = Farm.query.options(undefer(Farm.boundary_coordinates)).filter(
             Farm.district.ilike(search_pattern)
         ).all()
     else:
         # Default: search user's farms first, then all farms
-        user_farms = Farm.query.filter(
+        user_farms = Farm.query.options(undefer(Farm.boundary_coordinates)).filter(
             Farm.user_id == user_id,
             or_(
                 Farm.farm_name.ilike(search_pattern),
@@ -111,7 +129,7 @@ def search_farms(user_id, query, search_type='name'):
         
         # If no user farms found, search all farms
         if not user_farms:
-            farms = Farm.query.filter(
+            farms = Farm.query.options(undefer(Farm.boundary_coordinates)).filter(
                 or_(
                     Farm.farm_name.ilike(search_pattern),
                     Farm.registration_number.ilike(search_pattern),
@@ -123,7 +141,7 @@ def search_farms(user_id, query, search_type='name'):
             farms = user_farms
     
     # Sort: user's farms first, then others
-    farms_list = [farm.to_dict() for farm in farms]
+    farms_list = Farm.bulk_to_dicts(farms)
     farms_list.sort(key=lambda x: (x['user_id'] != user_id, x.get('farm_name', '')))
     
     return farms_list
\ No newline at end of file
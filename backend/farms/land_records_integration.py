@@ -4,9 +4,12 @@ Connects to actual government databases for farm verification.
 """
 import requests
 import os
+import copy
 from datetime import datetime, timedelta
 import json
 import random
+import time
+from functools import lru_cache
 
 # Government Land Records API Configuration
 TN_LAND_RECORDS_BASE_URL = os.getenv('TN_LAND_RECORDS_API', 'https://tnreginet.gov.in/api/v1')
@@ -14,6 +17,11 @@ NATIONAL_LAND_RECORDS_URL = os.getenv('NATIONAL_LAND_RECORDS_API', 'https://land
 API_KEY = os.getenv('LAND_RECORDS_API_KEY', '')  # Set in environment variables
 API_TIMEOUT = 30  # seconds
 
+# Land records change rarely; cache responses and revalidate with ETags
+LAND_RECORDS_CACHE_TTL = int(os.getenv('LAND_RECORDS_CACHE_TTL', 3600))  # seconds
+LAND_RECORDS_CACHE_MAX_ENTRIES = 256
+_response_cache = {}  # cache key -> {body, etag, last_modified, expires_at}
+
 # Fallback to mock data if APIs are unavailable (for development)
 USE_MOCK_DATA = os.getenv('USE_MOCK_LAND_RECORDS', 'True').lower() == 'true'
 
@@ -45,20 +53,9 @@ def verify_survey_number(survey_number, district, taluk=None, village=None):
             'api_key': API_KEY
         }
         
-        headers = {
-            'Content-Type': 'application/json',
-            'Authorization': f'Bearer {API_KEY}'
-        }
-        
-        response = requests.post(
-            endpoint,
-            json=payload,
-            headers=headers,
-            timeout=API_TIMEOUT
-        )
+        status_code, data = _post_land_records(endpoint, payload)
         
-        if response.status_code == 200:
-            data = response.json()
+        if status_code == 200:
             return {
                 'verified': data.get('verified', False),
                 'owner_name': data.get('pattadar_name', 'Unknown'),
@@ -79,7 +76,7 @@ def verify_survey_number(survey_number, district, taluk=None, village=None):
                 'source': 'TN Land Records',
                 'verified_at': datetime.utcnow().isoformat()
             }
-        elif response.status_code == 404:
+        elif status_code == 404:
             return {
                 'verified': False,
                 'error': 'Survey number not found in government records',
@@ -124,21 +121,9 @@ def fetch_land_boundaries(survey_number, district, taluk=None, village=None):
             'api_key': API_KEY
         }
         
-        headers = {
-            'Content-Type': 'application/json',
-            'Authorization': f'Bearer {API_KEY}'
-        }
-        
-        response = requests.post(
-            endpoint,
-            json=payload,
-            headers=headers,
-            timeout=API_TIMEOUT
-        )
+        status_code, data = _post_land_records(endpoint, payload)
         
-        if response.status_code == 200:
-            data = response.json()
-            
+        if status_code == 200:
             # Extract coordinates from GeoJSON
             if 'geometry' in data and data['geometry']['type'] == 'Polygon':
                 coordinates = data['geometry']['coordinates'][0]
@@ -188,20 +173,10 @@ def search_land_by_owner(owner_name, district, limit=10):
             'api_key': API_KEY
         }
         
-        headers = {
-            'Content-Type': 'application/json',
-            'Authorization': f'Bearer {API_KEY}'
-        }
-        
-        response = requests.post(
-            endpoint,
-            json=payload,
-            headers=headers,
-            timeout=API_TIMEOUT
-        )
+        status_code, data = _post_land_records(endpoint, payload)
         
-        if response.status_code == 200:
-            return response.json().get('results', [])
+        if status_code == 200:
+            return data.get('results', [])
         else:
             return []
             
@@ -210,6 +185,70 @@ def search_land_by_owner(owner_name, district, limit=10):
 
 # Helper functions
 
+def _post_land_records(endpoint, payload):
+    """
+    POST to a land records endpoint with TTL caching and conditional requests.
+    Expired entries are revalidated with If-None-Match/If-Modified-Since; a
+    304 reply reuses the cached body without re-parsing JSON. Callers always
+    get their own copy of the body, never the cached object.
+    
+    Returns:
+        tuple: (status_code, parsed JSON body or None)
+    """
+    cache_key = json.dumps([endpoint, payload], sort_keys=True)
+    cached = _response_cache.get(cache_key)
+    now = time.time()
+    
+    if cached and cached['expires_at'] > now:
+        return 200, copy.deepcopy(cached['body'])
+    
+    headers = {
+        'Content-Type': 'application/json',
+        'Authorization': f'Bearer {API_KEY}'
+    }
+    if cached:
+        if cached['etag']:
+            headers['If-None-Match'] = cached['etag']
+        if cached['last_modified']:
+            headers['If-Modified-Since'] = cached['last_modified']
+    
+    response = requests.post(
+        endpoint,
+        json=payload,
+        headers=headers,
+        timeout=API_TIMEOUT
+    )
+    
+    if response.status_code == 304 and cached:
+        cached['expires_at'] = now + LAND_RECORDS_CACHE_TTL
+        return 200, copy.deepcopy(cached['body'])
+    
+    if response.status_code != 200:
+        return response.status_code, None
+    
+    body = response.json()
+    
+    # Evict the oldest entry once the cache is full
+    if cache_key not in _response_cache and len(_response_cache) >= LAND_RECORDS_CACHE_MAX_ENTRIES:
+        _response_cache.pop(next(iter(_response_cache)))
+    
+    _response_cache[cache_key] = {
+        'body': copy.deepcopy(body),
+        'etag': response.headers.get('ETag'),
+        'last_modified': response.headers.get('Last-Modified'),
+        'expires_at': now + LAND_RECORDS_CACHE_TTL
+    }
+    return 200, body
+
+@lru_cache(maxsize=128)
+def _get_ag_areas(district):
+    """
+    Memoized lookup of agricultural areas for a district.
+    The land_validator import stays deferred to avoid circular imports.
+    """
+    from satellite.land_validator import get_agricultural_areas_in_district
+    return get_agricultural_areas_in_district(district)
+
 def _parse_area(area_string):
     """
     Parse area string from land records to hectares.
@@ -264,10 +303,8 @@ def _mock_fetch_boundaries(survey_number, district):
     Mock boundary fetch for development/testing.
     Uses agricultural areas from land_validator based on district.
     """
-    from satellite.land_validator import get_agricultural_areas_in_district
-    
     # Get agricultural area coordinates for the district
-    ag_areas = get_agricultural_areas_in_district(district)
+    ag_areas = _get_ag_areas(district)
     
     if ag_areas:
         # Use first agricultural area found for this district
@@ -299,20 +336,25 @@ def get_farmer_land_location(farmer_name, user_id=None):
     """
     from models.database import db
     from models.farm import Farm
+    from sqlalchemy.orm import load_only
     
     try:
-        # Search for farms by farmer name (user's full_name)
-        query = Farm.query
+        # Search for farms by farmer name (user's full_name), loading only
+        # the columns needed below
+        query = Farm.query.options(load_only(
+            Farm.boundary_coordinates,
+            Farm.district,
+            Farm.farm_name,
+            Farm.area_hectares
+        ))
         
         if user_id:
-            query = query.filter_by(user_id=user_id)
+            query = query.filter(Farm.user_id == user_id)
         
         # Search by farm name matching farmer name
-        farms = query.filter(Farm.farm_name.ilike(f'%{farmer_name}%')).all()
+        farm = query.filter(Farm.farm_name.ilike(f'%{farmer_name}%')).first()
         
-        if farms:
-            # Return first matching farm
-            farm = farms[0]
+        if farm:
             coords = json.loads(farm.boundary_coordinates) if isinstance(farm.boundary_coordinates, str) else farm.boundary_coordinates
             
             # Calculate center
@@ -398,10 +440,8 @@ def create_demo_farm_from_location(location_query):
     # Search for matching location in our database of agricultural areas
     if not coords:
         # Instead of defaulting to Coimbatore, use agricultural areas from land_validator
-        from satellite.land_validator import get_agricultural_areas_in_district
-        
         # Try to find any agricultural area (NOT just Coimbatore)
-        ag_areas = get_agricultural_areas_in_district(query_lower)
+        ag_areas = _get_ag_areas(query_lower)
         
         if ag_areas:
             location_name = list(ag_areas.keys())[0]
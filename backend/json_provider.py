@@ -0,0 +1,52 @@
+"""
+Fast JSON provider for Flask backed by orjson.
+Falls back to Flask's default provider when orjson is not installed.
+"""
+import decimal
+
+from flask.json.provider import JSONProvider
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+if ORJSON_AVAILABLE:
+    # Numpy scalars/arrays show up throughout the analysis payloads; non-str
+    # keys keep parity with the stdlib encoder for int-keyed dicts.
+    _ORJSON_OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+
+def _default(obj):
+    """Serialize types orjson does not handle natively."""
+    if isinstance(obj, decimal.Decimal):
+        return str(obj)
+    if hasattr(obj, '__html__'):
+        return str(obj.__html__())
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+class OrjsonProvider(JSONProvider):
+    """Flask JSON provider that encodes responses with orjson."""
+
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, default=_default, option=_ORJSON_OPTIONS).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        # Emit bytes directly instead of round-tripping through str
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(
+            orjson.dumps(obj, default=_default, option=_ORJSON_OPTIONS),
+            mimetype='application/json'
+        )
+
+
+def init_json_provider(app):
+    """Use orjson for jsonify/request parsing when it is available."""
+    if ORJSON_AVAILABLE:
+        app.json = OrjsonProvider(app)
+    return app
@@ -4,12 +4,29 @@ import os
 
 db = SQLAlchemy()
 
+# Connection pool settings for server databases (PostgreSQL/MySQL).
+# LIFO reuse keeps a small hot set of connections alive.
+ENGINE_POOL_OPTIONS = {
+    'pool_size': 20,
+    'max_overflow': 40,
+    'pool_pre_ping': True,
+    'pool_recycle': 1800,
+    'pool_use_lifo': True
+}
+
 def init_db(app):
     """Initialize database with Flask app"""
+    # SQLite has no server-side connection limits; keep its default pool
+    if not app.config.get('SQLALCHEMY_DATABASE_URI', '').startswith('sqlite'):
+        app.config.setdefault('SQLALCHEMY_ENGINE_OPTIONS', ENGINE_POOL_OPTIONS)
     db.init_app(app)
     with app.app_context():
         try:
             db.create_all()
+            # create_all skips indexes on tables that already exist
+            for table in db.metadata.sorted_tables:
+                for index in table.indexes:
+                    index.create(bind=db.engine, checkfirst=True)
         except Exception as e:
             print(f"Warning: Database initialization failed: {e}")
             print("Continuing without database...")
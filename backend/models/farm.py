@@ -1,9 +1,13 @@
 from models.database import db
+from sqlalchemy.orm import deferred
 from datetime import datetime
 import json
 
 class Farm(db.Model):
     __tablename__ = 'farms'
+    __table_args__ = (
+        db.Index('ix_farms_user_status', 'user_id', 'verification_status'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False, index=True)
@@ -11,7 +15,8 @@ class Farm(db.Model):
     registration_number = db.Column(db.String(100))
     survey_number = db.Column(db.String(100))
     district = db.Column(db.String(255))
-    boundary_coordinates = db.Column(db.JSON)
+    # Polygon vertex lists can be large; only loaded when accessed or undeferred
+    boundary_coordinates = deferred(db.Column(db.JSON))
     area_hectares = db.Column(db.Numeric(10, 2))
     verification_status = db.Column(db.String(50), default='pending')
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
@@ -19,6 +24,12 @@ class Farm(db.Model):
     
     def to_dict(self):
         """Convert farm object to dictionary"""
+        # Convert each value once; area is reported under two keys
+        area = float(self.area_hectares) if self.area_hectares else None
+        status = self.verification_status
+        created_at = self.created_at
+        updated_at = self.updated_at
+        
         return {
             'id': self.id,
             'user_id': self.user_id,
@@ -27,20 +38,44 @@ class Farm(db.Model):
             'survey_number': self.survey_number,
             'district': self.district,
             'boundary_coordinates': self.boundary_coordinates,
-            'area': float(self.area_hectares) if self.area_hectares else None,
-            'area_hectares': float(self.area_hectares) if self.area_hectares else None,
-            'verification_status': self.verification_status,
-            'verified': self.verification_status == 'verified',
+            'area': area,
+            'area_hectares': area,
+            'verification_status': status,
+            'verified': status == 'verified',
             'village': None,  # Placeholder for future enhancement
             'taluk': None,  # Placeholder for future enhancement
             'crop_type': None,  # Placeholder for future enhancement
             'last_analysis_date': None,  # Placeholder for future enhancement
-            'created_at': self.created_at.isoformat() if self.created_at else None,
-            'updated_at': self.updated_at.isoformat() if self.updated_at else None
+            'created_at': created_at.isoformat() if created_at else None,
+            'updated_at': updated_at.isoformat() if updated_at else None
         }
+    
+    def to_summary_dict(self):
+        """Convert farm object to a lightweight dictionary for list views"""
+        area = float(self.area_hectares) if self.area_hectares else None
+        status = self.verification_status
+        return {
+            'id': self.id,
+            'farm_name': self.farm_name,
+            'area': area,
+            'area_hectares': area,
+            'verification_status': status,
+            'verified': status == 'verified'
+        }
+    
+    @classmethod
+    def bulk_to_dicts(cls, farms):
+        """Convert a list of farm objects to dictionaries"""
+        to_dict = cls.to_dict
+        return [to_dict(farm) for farm in farms]
 
 class OTPVerification(db.Model):
     __tablename__ = 'otp_verification'
+    __table_args__ = (
+        # Matches the active-OTP lookups in otp_service; partial on PostgreSQL
+        db.Index('ix_otp_lookup', 'mobile', 'purpose', 'is_used', 'expires_at',
+                 postgresql_where=db.text('is_used = false')),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     mobile = db.Column(db.String(20), nullable=False)
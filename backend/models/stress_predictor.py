@@ -4,12 +4,76 @@ Uses RandomForestClassifier to predict future stress based on current conditions
 """
 
 import numpy as np
-import pickle
+import joblib
 import os
+import threading
 from sklearn.ensemble import RandomForestClassifier
 from sklearn.model_selection import train_test_split
 from sklearn.metrics import accuracy_score, classification_report
 
+# Optional ONNX Runtime backend for faster inference
+try:
+    import onnxruntime as ort
+    ONNXRUNTIME_AVAILABLE = True
+except ImportError:
+    ONNXRUNTIME_AVAILABLE = False
+
+# Risk level for each stress class (0=low, 1=medium, 2=high)
+_RISK_LEVELS = ('low', 'medium', 'high')
+
+# Minimum acceptable held-out accuracy for the compact forest
+MIN_ACCURACY = 0.85
+
+
+class FlatForest:
+    """
+    Random forest flattened into padded node arrays.
+    
+    All trees are walked level by level for every row at once using array
+    indexing instead of per-tree Python calls, which is much cheaper than
+    sklearn's predict_proba for the small 7-row forecast batches.
+    """
+    
+    def __init__(self, forest):
+        trees = [estimator.tree_ for estimator in forest.estimators_]
+        n_trees = len(trees)
+        max_nodes = max(tree.node_count for tree in trees)
+        n_classes = forest.n_classes_
+        
+        self.feature = np.zeros((n_trees, max_nodes), dtype=np.intp)
+        self.threshold = np.zeros((n_trees, max_nodes))
+        self.children_left = np.full((n_trees, max_nodes), -1, dtype=np.intp)
+        self.children_right = np.full((n_trees, max_nodes), -1, dtype=np.intp)
+        self.value = np.zeros((n_trees, max_nodes, n_classes))
+        self.max_depth = max(tree.max_depth for tree in trees)
+        
+        for i, tree in enumerate(trees):
+            n = tree.node_count
+            # Leaves have feature -2; any valid index works since they never split
+            self.feature[i, :n] = np.maximum(tree.feature, 0)
+            self.threshold[i, :n] = tree.threshold
+            self.children_left[i, :n] = tree.children_left
+            self.children_right[i, :n] = tree.children_right
+            counts = tree.value[:, 0, :]
+            self.value[i, :n] = counts / counts.sum(axis=1, keepdims=True)
+    
+    def predict_proba(self, X):
+        """Average per-tree class probabilities, matching sklearn's RandomForest."""
+        # sklearn compares float32 features against the stored thresholds
+        X = np.asarray(X, dtype=np.float32)
+        trees = np.arange(self.feature.shape[0])[:, None]
+        rows = np.arange(X.shape[0])[None, :]
+        node = np.zeros((self.feature.shape[0], X.shape[0]), dtype=np.intp)
+        
+        for _ in range(self.max_depth):
+            go_left = X[rows, self.feature[trees, node]] <= self.threshold[trees, node]
+            child = np.where(go_left, self.children_left[trees, node],
+                             self.children_right[trees, node])
+            # Rows that already reached a leaf (child == -1) stay put
+            node = np.where(child >= 0, child, node)
+        
+        return self.value[trees, node].mean(axis=0)
+
 
 class StressPredictor:
     """Machine Learning model for predicting water stress."""
@@ -22,7 +86,10 @@ class StressPredictor:
             model_path (str): Path to save/load the model
         """
         self.model_path = model_path
+        self.onnx_path = os.path.splitext(model_path)[0] + '.onnx'
         self.model = None
+        self.flat_forest = None
+        self.onnx_session = None
         self.feature_importance = None
         
         # Load model if it exists
@@ -39,93 +106,67 @@ class StressPredictor:
         Returns:
             tuple: (X_features, y_labels)
         """
-        np.random.seed(42)
+        rng = np.random.default_rng(42)
         
         # Features: NDVI, temperature, humidity, rainfall, days_since_rain
-        X = np.zeros((n_samples, 5))
-        y = np.zeros(n_samples, dtype=int)
+        # NDVI: 0.1 to 0.9
+        ndvi = rng.uniform(0.1, 0.9, n_samples)
         
-        for i in range(n_samples):
-            # Generate correlated features
-            # NDVI: 0.1 to 0.9
-            ndvi = np.random.uniform(0.1, 0.9)
-            
-            # Temperature: 15°C to 45°C (higher temp = more stress)
-            temp = np.random.uniform(15, 45)
-            
-            # Humidity: 20% to 90% (lower humidity = more stress)
-            humidity = np.random.uniform(20, 90)
-            
-            # Rainfall last 7 days: 0mm to 100mm
-            rainfall = np.random.exponential(scale=15)
-            rainfall = min(rainfall, 100)
-            
-            # Days since last rain: 0 to 30
-            days_since_rain = np.random.poisson(lam=7)
-            days_since_rain = min(days_since_rain, 30)
-            
-            # Create realistic correlations
-            if rainfall > 20:
-                # Recent good rain
-                ndvi = min(ndvi + np.random.uniform(0.1, 0.3), 0.9)
-                days_since_rain = max(0, days_since_rain - 5)
-                humidity = min(humidity + np.random.uniform(10, 20), 90)
-            
-            if temp > 35:
-                # High temperature stress
-                ndvi = max(ndvi - np.random.uniform(0.1, 0.25), 0.1)
-                humidity = max(humidity - np.random.uniform(10, 20), 20)
-            
-            if days_since_rain > 15:
-                # Prolonged drought
-                ndvi = max(ndvi - np.random.uniform(0.15, 0.35), 0.1)
-                humidity = max(humidity - np.random.uniform(15, 25), 20)
-            
-            # Store features
-            X[i] = [ndvi, temp, humidity, rainfall, days_since_rain]
-            
-            # Determine stress level (0=low, 1=medium, 2=high)
-            stress_score = 0
-            
-            # NDVI contribution
-            if ndvi < 0.3:
-                stress_score += 3
-            elif ndvi < 0.5:
-                stress_score += 2
-            elif ndvi < 0.6:
-                stress_score += 1
-            
-            # Temperature contribution
-            if temp > 38:
-                stress_score += 2
-            elif temp > 32:
-                stress_score += 1
-            
-            # Humidity contribution
-            if humidity < 35:
-                stress_score += 2
-            elif humidity < 50:
-                stress_score += 1
-            
-            # Rainfall contribution
-            if rainfall < 5:
-                stress_score += 2
-            elif rainfall < 15:
-                stress_score += 1
-            
-            # Days since rain contribution
-            if days_since_rain > 20:
-                stress_score += 2
-            elif days_since_rain > 10:
-                stress_score += 1
-            
-            # Map to stress levels
-            if stress_score >= 7:
-                y[i] = 2  # High stress
-            elif stress_score >= 4:
-                y[i] = 1  # Medium stress
-            else:
-                y[i] = 0  # Low stress
+        # Temperature: 15°C to 45°C (higher temp = more stress)
+        temp = rng.uniform(15, 45, n_samples)
+        
+        # Humidity: 20% to 90% (lower humidity = more stress)
+        humidity = rng.uniform(20, 90, n_samples)
+        
+        # Rainfall last 7 days: 0mm to 100mm
+        rainfall = np.minimum(rng.exponential(scale=15, size=n_samples), 100)
+        
+        # Days since last rain: 0 to 30
+        days_since_rain = np.minimum(rng.poisson(lam=7, size=n_samples), 30)
+        
+        # Create realistic correlations
+        # Recent good rain
+        wet = rainfall > 20
+        n_wet = np.count_nonzero(wet)
+        ndvi[wet] = np.minimum(ndvi[wet] + rng.uniform(0.1, 0.3, n_wet), 0.9)
+        days_since_rain[wet] = np.maximum(0, days_since_rain[wet] - 5)
+        humidity[wet] = np.minimum(humidity[wet] + rng.uniform(10, 20, n_wet), 90)
+        
+        # High temperature stress
+        hot = temp > 35
+        n_hot = np.count_nonzero(hot)
+        ndvi[hot] = np.maximum(ndvi[hot] - rng.uniform(0.1, 0.25, n_hot), 0.1)
+        humidity[hot] = np.maximum(humidity[hot] - rng.uniform(10, 20, n_hot), 20)
+        
+        # Prolonged drought
+        drought = days_since_rain > 15
+        n_drought = np.count_nonzero(drought)
+        ndvi[drought] = np.maximum(ndvi[drought] - rng.uniform(0.15, 0.35, n_drought), 0.1)
+        humidity[drought] = np.maximum(humidity[drought] - rng.uniform(15, 25, n_drought), 20)
+        
+        # Store features in one contiguous float32 matrix (sklearn's trees
+        # work in float32 internally, so this avoids a conversion copy)
+        X = np.empty((n_samples, 5), dtype=np.float32)
+        X[:, 0] = ndvi
+        X[:, 1] = temp
+        X[:, 2] = humidity
+        X[:, 3] = rainfall
+        X[:, 4] = days_since_rain
+        
+        # Determine stress level (0=low, 1=medium, 2=high)
+        # NDVI: <0.3 -> 3, <0.5 -> 2, <0.6 -> 1
+        stress_score = 3 - np.digitize(ndvi, [0.3, 0.5, 0.6])
+        # Temperature: >38 -> 2, >32 -> 1
+        stress_score += np.digitize(temp, [32, 38], right=True)
+        # Humidity: <35 -> 2, <50 -> 1
+        stress_score += 2 - np.digitize(humidity, [35, 50])
+        # Rainfall: <5 -> 2, <15 -> 1
+        stress_score += 2 - np.digitize(rainfall, [5, 15])
+        # Days since rain: >20 -> 2, >10 -> 1
+        stress_score += np.digitize(days_since_rain, [10, 20], right=True)
+        
+        # Map to stress levels: >=7 high, >=4 medium, else low
+        y = np.digitize(stress_score, [4, 7])
         
         return X, y
     
@@ -151,18 +192,22 @@ class StressPredictor:
         )
         
         # Train Random Forest
+        # A small, shallow forest is plenty for 5 features and keeps the
+        # model file, load time and per-request inference small
         print("Training Random Forest model...")
         self.model = RandomForestClassifier(
-            n_estimators=100,
-            max_depth=10,
-            min_samples_split=10,
-            min_samples_leaf=5,
+            n_estimators=30,
+            max_depth=6,
+            min_samples_leaf=20,
             random_state=42,
             n_jobs=-1
         )
         
         self.model.fit(X_train, y_train)
         
+        # Parallel fitting helps, but joblib dispatch dominates 7-row predicts
+        self.model.n_jobs = 1
+        
         # Evaluate
         y_pred = self.model.predict(X_test)
         accuracy = accuracy_score(y_test, y_pred)
@@ -177,6 +222,8 @@ class StressPredictor:
         }
         
         print(f"Model trained! Accuracy: {accuracy:.2%}")
+        if accuracy < MIN_ACCURACY:
+            print(f"Warning: accuracy below {MIN_ACCURACY:.0%}; consider a larger forest")
         print(f"Feature importance: {self.feature_importance}")
         
         # Save model
@@ -204,11 +251,16 @@ class StressPredictor:
         if self.model is None:
             raise ValueError("Model not loaded. Please train or load a model first.")
         
-        predictions = []
+        forecast_days = weather_forecast[:7]
+        n_days = len(forecast_days)
+        
+        # Build the full feature matrix first; the rain/NDVI state is
+        # sequential but cheap, so the model is only invoked once
+        features = np.empty((n_days, 5))
         days_since_rain = 0
         cumulative_rainfall = 0
         
-        for day_idx, forecast in enumerate(weather_forecast[:7]):
+        for day_idx, forecast in enumerate(forecast_days):
             temp = forecast.get('temp', 25)
             humidity = forecast.get('humidity', 60)
             rainfall = forecast.get('rainfall', 0)
@@ -229,39 +281,41 @@ class StressPredictor:
             elif temp > 35 or days_since_rain > 7:
                 estimated_ndvi = max(0.1, estimated_ndvi - 0.015 * (day_idx + 1))
             
-            # Prepare features
-            features = np.array([[
-                estimated_ndvi,
-                temp,
-                humidity,
-                cumulative_rainfall,
-                days_since_rain
-            ]])
-            
-            # Predict
-            stress_class = self.model.predict(features)[0]
-            stress_proba = self.model.predict_proba(features)[0]
-            
-            # Map to risk levels
-            risk_levels = ['low', 'medium', 'high']
-            risk_level = risk_levels[stress_class]
-            
+            # Scalar writes into the preallocated row; no per-day temporaries
+            row = features[day_idx]
+            row[0] = estimated_ndvi
+            row[1] = temp
+            row[2] = humidity
+            row[3] = cumulative_rainfall
+            row[4] = days_since_rain
+        
+        # Predict all days in one call; classes come from the probabilities
+        stress_proba = self._predict_proba(features)
+        stress_classes = stress_proba.argmax(axis=1)
+        
+        # Since the class is the argmax, its probability is also the confidence
+        class_proba = stress_proba[np.arange(n_days), stress_classes]
+        
+        predictions = []
+        
+        for day_idx, forecast in enumerate(forecast_days):
+            stress_class = stress_classes[day_idx]
             predictions.append({
                 'day': day_idx + 1,
                 'stress_class': int(stress_class),
-                'stress_probability': float(stress_proba[stress_class]),
-                'risk_level': risk_level,
-                'confidence_score': float(max(stress_proba)),
-                'estimated_ndvi': round(estimated_ndvi, 3),
-                'temp': temp,
-                'humidity': humidity,
-                'rainfall': rainfall,
-                'days_since_rain': days_since_rain
+                'stress_probability': float(class_proba[day_idx]),
+                'risk_level': _RISK_LEVELS[stress_class],
+                'confidence_score': float(class_proba[day_idx]),
+                'estimated_ndvi': round(float(features[day_idx, 0]), 3),
+                'temp': forecast.get('temp', 25),
+                'humidity': forecast.get('humidity', 60),
+                'rainfall': forecast.get('rainfall', 0),
+                'days_since_rain': int(features[day_idx, 4])
             })
         
         # Overall summary
-        high_stress_days = sum(1 for p in predictions if p['stress_class'] == 2)
-        avg_stress_prob = np.mean([p['stress_probability'] for p in predictions])
+        high_stress_days = int(np.count_nonzero(stress_classes == 2))
+        avg_stress_prob = float(class_proba.mean())
         
         # Determine overall risk
         if high_stress_days >= 3:
@@ -281,7 +335,7 @@ class StressPredictor:
                 'high_stress_days': high_stress_days,
                 'average_stress_probability': round(avg_stress_prob, 3),
                 'recommendation': recommendation,
-                'confidence': round(np.mean([p['confidence_score'] for p in predictions]), 3)
+                'confidence': round(avg_stress_prob, 3)
             },
             'feature_importance': self.feature_importance
         }
@@ -291,22 +345,81 @@ class StressPredictor:
         # Create directory if it doesn't exist
         os.makedirs(os.path.dirname(self.model_path), exist_ok=True)
         
-        with open(self.model_path, 'wb') as f:
-            pickle.dump({
-                'model': self.model,
-                'feature_importance': self.feature_importance
-            }, f)
+        # Compressed joblib keeps the artifact small; plain pickles from
+        # older versions still load through joblib.load
+        joblib.dump({
+            'model': self.model,
+            'feature_importance': self.feature_importance
+        }, self.model_path, compress=3)
         
         print(f"Model saved to {self.model_path}")
+        
+        self.export_onnx()
+        self._load_onnx_session()
+        self._build_flat_forest()
+    
+    def export_onnx(self):
+        """Export the trained model to ONNX alongside the pickle (if skl2onnx is installed)."""
+        try:
+            from skl2onnx import convert_sklearn
+            from skl2onnx.common.data_types import FloatTensorType
+            
+            onx = convert_sklearn(
+                self.model,
+                initial_types=[('X', FloatTensorType([None, 5]))],
+                options={id(self.model): {'zipmap': False}}
+            )
+            with open(self.onnx_path, 'wb') as f:
+                f.write(onx.SerializeToString())
+            print(f"ONNX model saved to {self.onnx_path}")
+        except ImportError:
+            # Remove any stale export so it can't shadow the new model
+            if os.path.exists(self.onnx_path):
+                os.remove(self.onnx_path)
+        except Exception as e:
+            print(f"Error exporting ONNX model: {e}")
+            if os.path.exists(self.onnx_path):
+                os.remove(self.onnx_path)
+    
+    def _load_onnx_session(self):
+        """Create an ONNX Runtime session for the exported model, if available."""
+        self.onnx_session = None
+        if not ONNXRUNTIME_AVAILABLE or not os.path.exists(self.onnx_path):
+            return
+        try:
+            self.onnx_session = ort.InferenceSession(
+                self.onnx_path, providers=['CPUExecutionProvider']
+            )
+        except Exception as e:
+            print(f"Error loading ONNX model, using scikit-learn: {e}")
+    
+    def _predict_proba(self, features):
+        """Class probabilities via ONNX Runtime or the flattened forest, falling back to scikit-learn."""
+        if self.onnx_session is not None:
+            return self.onnx_session.run(None, {'X': features.astype(np.float32)})[1]
+        if self.flat_forest is not None:
+            return self.flat_forest.predict_proba(features)
+        return self.model.predict_proba(features)
+    
+    def _build_flat_forest(self):
+        """Flatten the loaded forest for fast small-batch inference."""
+        try:
+            self.flat_forest = FlatForest(self.model)
+        except Exception as e:
+            self.flat_forest = None
+            print(f"Error flattening model, using scikit-learn: {e}")
     
     def load_model(self):
         """Load a trained model from disk."""
         try:
-            with open(self.model_path, 'rb') as f:
-                data = pickle.load(f)
-                self.model = data['model']
-                self.feature_importance = data['feature_importance']
+            data = joblib.load(self.model_path)
+            self.model = data['model']
+            self.feature_importance = data['feature_importance']
+            # Older pickles were saved with n_jobs=-1; predict single-threaded
+            self.model.n_jobs = 1
             print(f"Model loaded from {self.model_path}")
+            self._load_onnx_session()
+            self._build_flat_forest()
         except FileNotFoundError:
             print(f"Model file not found at {self.model_path}")
         except Exception as e:
@@ -327,6 +440,26 @@ def initialize_model():
         return StressPredictor(model_path)
 
 
+# Process-wide predictor so the forest is unpickled once, not per request
+_INSTANCE = None
+_INSTANCE_LOCK = threading.Lock()
+
+
+def get_predictor(model_path='models/stress_model.pkl'):
+    """
+    Get the shared StressPredictor, loading it on first use.
+    
+    The instance lives for the whole process; callers must not replace its
+    model in place except via train_model().
+    """
+    global _INSTANCE
+    if _INSTANCE is None:
+        with _INSTANCE_LOCK:
+            if _INSTANCE is None:
+                _INSTANCE = StressPredictor(model_path)
+    return _INSTANCE
+
+
 if __name__ == '__main__':
     # Train and test the model
     predictor = initialize_model()
@@ -17,11 +17,12 @@ class User(db.Model):
     
     def to_dict(self):
         """Convert user object to dictionary"""
+        created_at = self.created_at
         return {
             'id': self.id,
             'full_name': self.full_name,
             'mobile': self.mobile,
             'email': self.email,
             'mobile_verified': self.mobile_verified,
-            'created_at': self.created_at.isoformat() if self.created_at else None
+            'created_at': created_at.isoformat() if created_at else None
         }
\ No newline at end of file
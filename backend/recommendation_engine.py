@@ -1,5 +1,25 @@
+import numpy as np
+from functools import lru_cache
 from crop_database import CropDatabase
 
+
+# Crop metadata is immutable at runtime, so these lookups are safe to memoize.
+# Returned dicts are shared between callers and must be treated as read-only.
+@lru_cache(maxsize=64)
+def _crop(crop_type):
+    return CropDatabase.get_crop(crop_type)
+
+
+@lru_cache(maxsize=256)
+def _water_req(crop_type, field_area_ha, stress_level):
+    return CropDatabase.calculate_water_requirement(crop_type, field_area_ha, stress_level)
+
+
+@lru_cache(maxsize=64)
+def _growth_advice(crop_type):
+    return CropDatabase.get_growth_stage_advice(crop_type)
+
+
 class RecommendationEngine:
     def generate_recommendations(self, zone_stats, quadrants, deficit, ndvi_mean, crop_type='wheat', field_area_ha=1.0):
         """
@@ -16,21 +36,23 @@ class RecommendationEngine:
         Returns:
             list: Top 5 recommendations with priority, urgency, zone, action, etc.
         """
-        recommendations = []
+        # One slot per rule, indexed by priority - 1; rules are already in
+        # priority order, so no sort is needed
+        slots = [None] * 5
         
         # Get crop information
-        crop = CropDatabase.get_crop(crop_type)
+        crop = _crop(crop_type)
         crop_name = crop['name'] if crop else crop_type.title()
         
         # Check for critical stress zones
         critical_pct = zone_stats.get('Critical', {}).get('percentage', 0)
         if critical_pct > 10:
-            water_req = CropDatabase.calculate_water_requirement(crop_type, field_area_ha, 'critical')
+            water_req = _water_req(crop_type, field_area_ha, 'critical')
             water_amount_str = f"{water_req['water_mm']}mm ({water_req['liters_per_hectare']:,} L/hectare)" if water_req else '50-60% increase'
             
-            growth_advice = CropDatabase.get_growth_stage_advice(crop_type)
+            growth_advice = _growth_advice(crop_type)
             
-            recommendations.append({
+            slots[0] = {
                 'priority': 1,
                 'urgency': 'CRITICAL',
                 'zone': 'Critical',
@@ -40,15 +62,15 @@ class RecommendationEngine:
                 'timing': 'Within 24 hours',
                 'cost_impact': 'High',
                 'growth_stage_note': growth_advice
-            })
+            }
         
         # Check for high stress zones
         high_pct = zone_stats.get('High', {}).get('percentage', 0)
         if high_pct > 20:
-            water_req = CropDatabase.calculate_water_requirement(crop_type, field_area_ha, 'high')
+            water_req = _water_req(crop_type, field_area_ha, 'high')
             water_amount_str = f"{water_req['water_mm']}mm ({water_req['liters_per_hectare']:,} L/hectare)" if water_req else '30-40% increase'
             
-            recommendations.append({
+            slots[1] = {
                 'priority': 2,
                 'urgency': 'HIGH',
                 'zone': 'High',
@@ -57,14 +79,14 @@ class RecommendationEngine:
                 'water_amount': water_amount_str,
                 'timing': 'Within 48 hours',
                 'cost_impact': 'Medium'
-            })
+            }
         
         # Check for water deficit
         if deficit.get('status') == 'High':
             deficit_mm = deficit.get('deficit_mm', 0)
             liters_needed = int(deficit_mm * 10000 * field_area_ha)
             
-            recommendations.append({
+            slots[2] = {
                 'priority': 3,
                 'urgency': 'HIGH',
                 'zone': 'Field-wide',
@@ -73,14 +95,17 @@ class RecommendationEngine:
                 'water_amount': f'{deficit_mm:.1f}mm ({liters_needed:,} L total)',
                 'timing': 'Within 72 hours',
                 'cost_impact': 'High'
-            })
+            }
         
         # Check for uneven distribution
-        quadrant_stresses = [q['stressed_percentage'] for q in quadrants.values()]
-        if len(quadrant_stresses) > 0:
-            stress_std = sum((s - sum(quadrant_stresses)/len(quadrant_stresses))**2 for s in quadrant_stresses) / len(quadrant_stresses)
+        quadrant_stresses = np.fromiter(
+            (q['stressed_percentage'] for q in quadrants.values()),
+            dtype=np.float64, count=len(quadrants)
+        )
+        if quadrant_stresses.size > 0:
+            stress_std = quadrant_stresses.var()
             if stress_std > 100:  # High variance indicates uneven distribution
-                recommendations.append({
+                slots[3] = {
                     'priority': 4,
                     'urgency': 'MODERATE',
                     'zone': 'Variable',
@@ -89,7 +114,7 @@ class RecommendationEngine:
                     'water_amount': 'System check',
                     'timing': 'Within 1 week',
                     'cost_impact': 'Low'
-                })
+                }
         
         # Healthy field recommendation
         healthy_pct = zone_stats.get('Healthy', {}).get('percentage', 0)
@@ -97,7 +122,7 @@ class RecommendationEngine:
             # Crop-specific NDVI assessment
             ndvi_assessment = CropDatabase.assess_ndvi_for_crop(crop_type, ndvi_mean)
             
-            recommendations.append({
+            slots[4] = {
                 'priority': 5,
                 'urgency': 'INFO',
                 'zone': 'Field-wide',
@@ -107,13 +132,10 @@ class RecommendationEngine:
                 'timing': 'Continue monitoring',
                 'cost_impact': 'None',
                 'ndvi_status': ndvi_assessment['status']
-            })
-        
-        # Sort by priority (lowest number = highest priority)
-        recommendations.sort(key=lambda x: x['priority'])
+            }
         
-        # Return top 5 recommendations
-        return recommendations[:5]
+        # Return top 5 recommendations (lowest priority number first)
+        return [rec for rec in slots if rec is not None]
     
     def calculate_water_savings(self, zone_stats, crop_type='wheat', field_area_ha=1.0):
         """
@@ -133,7 +155,7 @@ class RecommendationEngine:
         critical_pct = zone_stats.get('Critical', {}).get('percentage', 0)
         
         # Get crop-specific water needs
-        crop = CropDatabase.get_crop(crop_type)
+        crop = _crop(crop_type)
         base_water_mm = crop['water_need_mm_per_week'] if crop else 40
         
         # Calculate current efficiency based on field health
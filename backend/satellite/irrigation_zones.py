@@ -1,11 +1,252 @@
 """
 Irrigation Zone Mapping - Color-coded zones with farmer-friendly instructions
 """
+import functools
+import hashlib
+import json
+import os
+import tempfile
+import threading
 import numpy as np
+from types import MappingProxyType
 from typing import Dict, List, Tuple
 from datetime import datetime, timedelta
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
 
+try:
+    from diskcache import Cache
+    DISKCACHE_AVAILABLE = True
+except ImportError:
+    DISKCACHE_AVAILABLE = False
+
+# On-disk memo for generate_irrigation_zones (NDVI changes daily)
+ZONES_CACHE_DIR = os.getenv('ZONES_CACHE_DIR', os.path.join(tempfile.gettempdir(), 'aquaadvisor-zones'))
+ZONES_CACHE_TTL = 6 * 60 * 60
+ZONES_CACHE_SIZE_LIMIT = 256 * 1024 * 1024
+
+_zones_cache = None
+_zones_cache_lock = threading.Lock()
+
+# Water to apply per zone (critical, high, moderate, healthy) in mm
+ZONE_WATER_MM = np.array([60, 40, 25, 0], dtype=np.float64)
+
+ZONE_KEYS = ('red', 'orange', 'yellow', 'green')
+
+# (zone_id, fill color, label) for the GeoJSON zone overlays
+_ZONE_OVERLAY_STYLES = (
+    (0, '#DC2626', '🔴 Critical'),
+    (1, '#EA580C', '🟠 High'),
+    (2, '#EAB308', '🟡 Moderate'),
+    (3, '#16A34A', '🟢 Healthy')
+)
+
+# Static per-zone presentation data (colors, timing, translations).
+# Built once at import; only area/water figures are filled in per request.
+_ZONE_STATIC = {
+    'red': MappingProxyType({
+        'color': '#DC2626',
+        'color_name': 'Red',
+        'priority': 1,
+        'water_mm': 60,
+        'timing': 'TODAY',
+        'timing_days': 0,
+        'english': {
+            'title': '🔴 Critical - Water Immediately',
+            'action': 'Give 60mm water TODAY',
+            'reason': 'Crops are very dry, leaves turning yellow/brown',
+            'location': 'Critical stress areas'
+        },
+        'hindi': {
+            'title': '🔴 तुरंत पानी दें',
+            'action': 'आज ही 60 मिमी पानी दें',
+            'reason': 'फसल बहुत सूखी है, पत्ते पीले/भूरे हो रहे हैं',
+            'location': 'गंभीर तनाव क्षेत्र'
+        },
+        'tamil': {
+            'title': '🔴 உடனடியாக நீர் கொடுக்கவும்',
+            'action': 'இன்றே 60 மிமீ நீர் கொடுக்கவும்',
+            'reason': 'பயிர் மிகவும் வறண்டுள்ளது, இலைகள் மஞ்சள்/பழுப்பு நிறமாகிறது',
+            'location': 'கடுமையான அழுத்த பகுதிகள்'
+        }
+    }),
+    'orange': MappingProxyType({
+        'color': '#EA580C',
+        'color_name': 'Orange',
+        'priority': 2,
+        'water_mm': 40,
+        'timing': 'Within 2 days',
+        'timing_days': 2,
+        'english': {
+            'title': '🟠 High Priority - Water Soon',
+            'action': 'Give 40mm water in 2 days',
+            'reason': 'Soil moisture is low, crops showing stress',
+            'location': 'High stress zones'
+        },
+        'hindi': {
+            'title': '🟠 जल्द पानी दें',
+            'action': '2 दिन में 40 मिमी पानी दें',
+            'reason': 'मिट्टी में नमी कम है, फसल में तनाव दिख रहा है',
+            'location': 'उच्च तनाव क्षेत्र'
+        },
+        'tamil': {
+            'title': '🟠 விரைவில் நீர் கொடுக்கவும்',
+            'action': '2 நாட்களில் 40 மிமீ நீர் கொடுக்கவும்',
+            'reason': 'மண் ஈரப்பதம் குறைவாக உள்ளது, பயிர் அழுத்தம் காட்டுகிறது',
+            'location': 'உயர் அழுத்த மண்டலங்கள்'
+        }
+    }),
+    'yellow': MappingProxyType({
+        'color': '#EAB308',
+        'color_name': 'Yellow',
+        'priority': 3,
+        'water_mm': 25,
+        'timing': 'Within 4 days',
+        'timing_days': 4,
+        'english': {
+            'title': '🟡 Moderate - Schedule Irrigation',
+            'action': 'Give 25mm water in 4 days',
+            'reason': 'Crops starting to show stress, preventive watering needed',
+            'location': 'Moderate stress areas'
+        },
+        'hindi': {
+            'title': '🟡 सामान्य - पानी की योजना बनाएं',
+            'action': '4 दिन में 25 मिमी पानी दें',
+            'reason': 'फसल में थोड़ा तनाव दिख रहा है, रोकथाम के लिए पानी चाहिए',
+            'location': 'मध्यम तनाव क्षेत्र'
+        },
+        'tamil': {
+            'title': '🟡 மிதமான - நீர் திட்டமிடவும்',
+            'action': '4 நாட்களில் 25 மிமீ நீர் கொடுக்கவும்',
+            'reason': 'பயிர் சிறிது அழுத்தம் காட்டுகிறது, தடுப்பு நீர் தேவை',
+            'location': 'மிதமான அழுத்த பகுதிகள்'
+        }
+    }),
+    'green': MappingProxyType({
+        'color': '#16A34A',
+        'color_name': 'Green',
+        'priority': 4,
+        'water_mm': 0,
+        'timing': 'No watering needed',
+        'timing_days': 7,
+        'english': {
+            'title': '🟢 Healthy - No Irrigation Needed',
+            'action': 'No water needed now',
+            'reason': 'Crops are healthy with adequate soil moisture',
+            'location': 'Healthy zones'
+        },
+        'hindi': {
+            'title': '🟢 स्वस्थ - पानी की जरूरत नहीं',
+            'action': 'अभी पानी की आवश्यकता नहीं',
+            'reason': 'फसल स्वस्थ है और मिट्टी में पर्याप्त नमी है',
+            'location': 'स्वस्थ क्षेत्र'
+        },
+        'tamil': {
+            'title': '🟢 ஆரோக்கியம் - நீர் தேவையில்லை',
+            'action': 'இப்போது நீர் தேவையில்லை',
+            'reason': 'பயிர் ஆரோக்கியமாக உள்ளது, போதுமான மண் ஈரப்பதம்',
+            'location': 'ஆரோக்கியமான மண்டலங்கள்'
+        }
+    })
+}
+
+
+
+def _zone_static_copy(zone_key: str) -> dict:
+    """
+    Copy a zone's static template, including the per-language instruction dicts.
+    
+    The templates are shared module state, so responses must never hold
+    references to their nested dicts.
+    """
+    return {
+        key: dict(value) if isinstance(value, dict) else value
+        for key, value in _ZONE_STATIC[zone_key].items()
+    }
+
+
+def count_zone_pixels(stress_zones: np.ndarray) -> np.ndarray:
+    """
+    Count pixels per stress class in a single sorted pass.
+    
+    Labels outside 0-3 are ignored, so arbitrary integer rasters never
+    allocate more than the four class slots.
+    
+    Returns:
+        Length-4 int64 array of (critical, high, moderate, healthy) counts
+    """
+    values, value_counts = np.unique(stress_zones, return_counts=True)
+    counts = np.zeros(4, dtype=np.int64)
+    in_range = (values >= 0) & (values < 4)
+    counts[values[in_range].astype(np.intp)] = value_counts[in_range]
+    return counts
+
+
+def _get_zones_cache():
+    """Open the on-disk zones cache on first use."""
+    global _zones_cache
+    if _zones_cache is None:
+        with _zones_cache_lock:
+            if _zones_cache is None:
+                _zones_cache = Cache(ZONES_CACHE_DIR, size_limit=ZONES_CACHE_SIZE_LIMIT)
+    return _zones_cache
+
+
+def _zones_cache_key(ndvi_field, stress_zones, field_boundary, area_hectares) -> str:
+    """Content hash of the zone inputs plus today's date (the schedule is date-relative)."""
+    digest = hashlib.blake2b(digest_size=20)
+    for array in (ndvi_field, stress_zones):
+        if array is None:
+            digest.update(b'none')
+            continue
+        array = np.ascontiguousarray(array)
+        digest.update(f"{array.dtype.str}{array.shape}".encode('utf-8'))
+        digest.update(array.data)
+    digest.update(json.dumps(field_boundary, default=str).encode('utf-8'))
+    digest.update(repr(float(area_hectares)).encode('utf-8'))
+    digest.update(datetime.now().strftime('%Y-%m-%d').encode('utf-8'))
+    return digest.hexdigest()
+
+
+def _disk_cached(func):
+    """Memoize generate_irrigation_zones on disk when diskcache is installed."""
+    if not DISKCACHE_AVAILABLE:
+        return func
+    
+    @functools.wraps(func)
+    def wrapper(ndvi_field, stress_zones, field_boundary, area_hectares):
+        try:
+            cache = _get_zones_cache()
+            key = _zones_cache_key(ndvi_field, stress_zones, field_boundary, area_hectares)
+            cached = cache.get(key)
+        except Exception as e:
+            print(f"Zones cache unavailable: {e}")
+            return func(ndvi_field, stress_zones, field_boundary, area_hectares)
+        
+        if cached is not None:
+            return cached
+        
+        result = func(ndvi_field, stress_zones, field_boundary, area_hectares)
+        try:
+            cache.set(key, result, expire=ZONES_CACHE_TTL)
+        except Exception as e:
+            print(f"Zones cache write failed: {e}")
+        return result
+    
+    return wrapper
+
+
+def clear_zones_cache():
+    """Remove all cached irrigation zone results."""
+    if DISKCACHE_AVAILABLE:
+        _get_zones_cache().clear()
+
+
+@_disk_cached
 def generate_irrigation_zones(ndvi_field: np.ndarray, stress_zones: np.ndarray, 
                               field_boundary: list, area_hectares: float) -> Dict:
     """
@@ -25,151 +266,43 @@ def generate_irrigation_zones(ndvi_field: np.ndarray, stress_zones: np.ndarray,
     area_per_hectare = area_hectares / total_pixels
     area_acres = area_hectares * 2.47105  # Convert to acres
     
-    # Count pixels in each zone
-    critical_count = np.sum(stress_zones == 0)
-    high_count = np.sum(stress_zones == 1)
-    moderate_count = np.sum(stress_zones == 2)
-    healthy_count = np.sum(stress_zones == 3)
+    # Count pixels in each zone with a single pass over the raster
+    counts = count_zone_pixels(stress_zones)
     
-    # Calculate areas
-    critical_area = (critical_count / total_pixels) * area_acres
-    high_area = (high_count / total_pixels) * area_acres
-    moderate_area = (moderate_count / total_pixels) * area_acres
-    healthy_area = (healthy_count / total_pixels) * area_acres
+    # Calculate areas for all zones at once
+    zone_fractions = counts / total_pixels
+    zone_areas = zone_fractions * area_acres
     
     # Calculate water requirements (mm to liters conversion)
     # 1mm of water per hectare = 10,000 liters
     area_hectares_per_zone = area_hectares / total_pixels
     
-    critical_water_liters = critical_count * area_hectares_per_zone * 60 * 10000  # 60mm
-    high_water_liters = high_count * area_hectares_per_zone * 40 * 10000  # 40mm
-    moderate_water_liters = moderate_count * area_hectares_per_zone * 25 * 10000  # 25mm
+    zone_water_liters = counts * area_hectares_per_zone * ZONE_WATER_MM * 10000
     
-    total_water_liters = critical_water_liters + high_water_liters + moderate_water_liters
+    total_water_liters = zone_water_liters.sum()
     
     # Generate zones with bilingual instructions
-    zones = {
-        'red': {
-            'color': '#DC2626',
-            'color_name': 'Red',
-            'priority': 1,
-            'area_acres': round(critical_area, 2),
-            'area_hectares': round(critical_area / 2.47105, 2),
-            'percentage': round((critical_count / total_pixels) * 100, 1),
-            'water_mm': 60,
-            'water_liters': int(critical_water_liters),
-            'timing': 'TODAY',
-            'timing_days': 0,
-            'english': {
-                'title': '🔴 Critical - Water Immediately',
-                'action': 'Give 60mm water TODAY',
-                'reason': 'Crops are very dry, leaves turning yellow/brown',
-                'location': 'Critical stress areas'
-            },
-            'hindi': {
-                'title': '🔴 तुरंत पानी दें',
-                'action': 'आज ही 60 मिमी पानी दें',
-                'reason': 'फसल बहुत सूखी है, पत्ते पीले/भूरे हो रहे हैं',
-                'location': 'गंभीर तनाव क्षेत्र'
-            },
-            'tamil': {
-                'title': '🔴 உடனடியாக நீர் கொடுக்கவும்',
-                'action': 'இன்றே 60 மிமீ நீர் கொடுக்கவும்',
-                'reason': 'பயிர் மிகவும் வறண்டுள்ளது, இலைகள் மஞ்சள்/பழுப்பு நிறமாகிறது',
-                'location': 'கடுமையான அழுத்த பகுதிகள்'
-            }
-        },
-        'orange': {
-            'color': '#EA580C',
-            'color_name': 'Orange',
-            'priority': 2,
-            'area_acres': round(high_area, 2),
-            'area_hectares': round(high_area / 2.47105, 2),
-            'percentage': round((high_count / total_pixels) * 100, 1),
-            'water_mm': 40,
-            'water_liters': int(high_water_liters),
-            'timing': 'Within 2 days',
-            'timing_days': 2,
-            'english': {
-                'title': '🟠 High Priority - Water Soon',
-                'action': 'Give 40mm water in 2 days',
-                'reason': 'Soil moisture is low, crops showing stress',
-                'location': 'High stress zones'
-            },
-            'hindi': {
-                'title': '🟠 जल्द पानी दें',
-                'action': '2 दिन में 40 मिमी पानी दें',
-                'reason': 'मिट्टी में नमी कम है, फसल में तनाव दिख रहा है',
-                'location': 'उच्च तनाव क्षेत्र'
-            },
-            'tamil': {
-                'title': '🟠 விரைவில் நீர் கொடுக்கவும்',
-                'action': '2 நாட்களில் 40 மிமீ நீர் கொடுக்கவும்',
-                'reason': 'மண் ஈரப்பதம் குறைவாக உள்ளது, பயிர் அழுத்தம் காட்டுகிறது',
-                'location': 'உயர் அழுத்த மண்டலங்கள்'
-            }
-        },
-        'yellow': {
-            'color': '#EAB308',
-            'color_name': 'Yellow',
-            'priority': 3,
-            'area_acres': round(moderate_area, 2),
-            'area_hectares': round(moderate_area / 2.47105, 2),
-            'percentage': round((moderate_count / total_pixels) * 100, 1),
-            'water_mm': 25,
-            'water_liters': int(moderate_water_liters),
-            'timing': 'Within 4 days',
-            'timing_days': 4,
-            'english': {
-                'title': '🟡 Moderate - Schedule Irrigation',
-                'action': 'Give 25mm water in 4 days',
-                'reason': 'Crops starting to show stress, preventive watering needed',
-                'location': 'Moderate stress areas'
-            },
-            'hindi': {
-                'title': '🟡 सामान्य - पानी की योजना बनाएं',
-                'action': '4 दिन में 25 मिमी पानी दें',
-                'reason': 'फसल में थोड़ा तनाव दिख रहा है, रोकथाम के लिए पानी चाहिए',
-                'location': 'मध्यम तनाव क्षेत्र'
-            },
-            'tamil': {
-                'title': '🟡 மிதமான - நீர் திட்டமிடவும்',
-                'action': '4 நாட்களில் 25 மிமீ நீர் கொடுக்கவும்',
-                'reason': 'பயிர் சிறிது அழுத்தம் காட்டுகிறது, தடுப்பு நீர் தேவை',
-                'location': 'மிதமான அழுத்த பகுதிகள்'
-            }
-        },
-        'green': {
-            'color': '#16A34A',
-            'color_name': 'Green',
-            'priority': 4,
-            'area_acres': round(healthy_area, 2),
-            'area_hectares': round(healthy_area / 2.47105, 2),
-            'percentage': round((healthy_count / total_pixels) * 100, 1),
-            'water_mm': 0,
-            'water_liters': 0,
-            'timing': 'No watering needed',
-            'timing_days': 7,
-            'english': {
-                'title': '🟢 Healthy - No Irrigation Needed',
-                'action': 'No water needed now',
-                'reason': 'Crops are healthy with adequate soil moisture',
-                'location': 'Healthy zones'
-            },
-            'hindi': {
-                'title': '🟢 स्वस्थ - पानी की जरूरत नहीं',
-                'action': 'अभी पानी की आवश्यकता नहीं',
-                'reason': 'फसल स्वस्थ है और मिट्टी में पर्याप्त नमी है',
-                'location': 'स्वस्थ क्षेत्र'
-            },
-            'tamil': {
-                'title': '🟢 ஆரோக்கியம் - நீர் தேவையில்லை',
-                'action': 'இப்போது நீர் தேவையில்லை',
-                'reason': 'பயிர் ஆரோக்கியமாக உள்ளது, போதுமான மண் ஈரப்பதம்',
-                'location': 'ஆரோக்கியமான மண்டலங்கள்'
+    zones = {}
+    for i, zone_key in enumerate(ZONE_KEYS):
+        if counts[i] == 0:
+            # Empty zone: the frontend only needs ordering and a zero area
+            zones[zone_key] = {
+                'color': _ZONE_STATIC[zone_key]['color'],
+                'priority': _ZONE_STATIC[zone_key]['priority'],
+                'area_acres': 0,
+                'area_hectares': 0,
+                'percentage': 0,
+                'water_liters': 0
             }
+            continue
+        
+        zones[zone_key] = {
+            **_zone_static_copy(zone_key),
+            'area_acres': round(zone_areas[i], 2),
+            'area_hectares': round(zone_areas[i] / 2.47105, 2),
+            'percentage': round(zone_fractions[i] * 100, 1),
+            'water_liters': int(zone_water_liters[i])
         }
-    }
     
     # Generate irrigation schedule
     today = datetime.now()
@@ -263,6 +396,33 @@ def generate_irrigation_zones(ndvi_field: np.ndarray, stress_zones: np.ndarray,
     }
 
 
+def generate_irrigation_zones_json(ndvi_field: np.ndarray, stress_zones: np.ndarray,
+                                   field_boundary: list, area_hectares: float) -> bytes:
+    """
+    Generate irrigation zones serialized straight to UTF-8 JSON bytes.
+    
+    The payload is dominated by Hindi/Tamil strings, so it is encoded with
+    orjson when available and otherwise with the stdlib encoder without
+    ASCII escaping.
+    
+    Returns:
+        UTF-8 encoded JSON of generate_irrigation_zones' result
+    """
+    result = generate_irrigation_zones(ndvi_field, stress_zones, field_boundary, area_hectares)
+    
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(result, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS)
+    
+    return json.dumps(result, ensure_ascii=False, default=_numpy_default).encode('utf-8')
+
+
+def _numpy_default(obj):
+    """Convert NumPy scalars for the stdlib JSON encoder."""
+    if isinstance(obj, np.generic):
+        return obj.item()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
 def create_zone_geojson(stress_zones: np.ndarray, field_boundary: list) -> Dict:
     """
     Create GeoJSON overlays for colored irrigation zones.
@@ -274,28 +434,26 @@ def create_zone_geojson(stress_zones: np.ndarray, field_boundary: list) -> Dict:
     # For now, return simplified zone representation
     
     features = []
-    colors = {
-        0: {'color': '#DC2626', 'label': '🔴 Critical'},
-        1: {'color': '#EA580C', 'label': '🟠 High'},
-        2: {'color': '#EAB308', 'label': '🟡 Moderate'},
-        3: {'color': '#16A34A', 'label': '🟢 Healthy'}
+    counts = count_zone_pixels(stress_zones)
+    
+    # Every zone currently shares the field outline as its geometry
+    geometry = {
+        'type': 'Polygon',
+        'coordinates': [field_boundary]
     }
     
     # Simple representation - in production, would extract actual polygons
-    for zone_id, zone_info in colors.items():
-        if np.sum(stress_zones == zone_id) > 0:
+    for zone_id, color, label in _ZONE_OVERLAY_STYLES:
+        if counts[zone_id]:
             features.append({
                 'type': 'Feature',
                 'properties': {
                     'zone': zone_id,
-                    'fillColor': zone_info['color'],
+                    'fillColor': color,
                     'fillOpacity': 0.5,
-                    'label': zone_info['label']
+                    'label': label
                 },
-                'geometry': {
-                    'type': 'Polygon',
-                    'coordinates': [field_boundary]
-                }
+                'geometry': geometry
             })
     
     return {
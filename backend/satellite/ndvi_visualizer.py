@@ -5,99 +5,250 @@ Generates GeoJSON and visual representations
 import numpy as np
 import matplotlib
 matplotlib.use('Agg')  # Use non-interactive backend
-import matplotlib.pyplot as plt
+import matplotlib.patches as mpatches
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.cm import ScalarMappable
+from matplotlib.colors import Normalize
 import io
 import base64
+import copy
+import functools
+import hashlib
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from PIL import Image
 from typing import Dict, List, Tuple
 
+# RdYlGn colormap sampled once into a 256-entry RGB lookup table
+_RDYLGN_CMAP = matplotlib.colormaps['RdYlGn']
+_RDYLGN_LUT = (_RDYLGN_CMAP(np.linspace(0, 1, 256))[:, :3] * 255).astype(np.uint8)
+_NDVI_NORM = Normalize(vmin=0, vmax=1)
+
+# Stress zone colors (0=critical, 1=high, 2=moderate, 3=healthy)
+_STRESS_LUT = np.array([
+    [220, 38, 38],   # Critical - Red
+    [245, 158, 11],  # High - Orange
+    [252, 211, 77],  # Moderate - Yellow
+    [16, 185, 129]   # Healthy - Green
+], dtype=np.uint8)
+
+# Upscale factor for the plain (unannotated) PNG maps
+_PNG_SCALE = 4
+
+
+def _ndvi_to_rgb(ndvi_field: np.ndarray) -> np.ndarray:
+    """Map NDVI 0..1 onto the RdYlGn lookup table as (H, W, 3) uint8."""
+    idx = (np.clip(np.nan_to_num(ndvi_field), 0, 1) * 255).astype(np.uint8)
+    return _RDYLGN_LUT[idx]
+
+
+def _encode_png(rgb: np.ndarray, resample) -> str:
+    """Encode an (H, W, 3) uint8 array as a base64 PNG, upscaled for display."""
+    image = Image.fromarray(rgb)
+    height, width = rgb.shape[:2]
+    image = image.resize((width * _PNG_SCALE, height * _PNG_SCALE), resample)
+    
+    buffer = io.BytesIO()
+    image.save(buffer, format='PNG', optimize=False)
+    return base64.b64encode(buffer.getvalue()).decode('utf-8')
+
+
+# Per-thread Figure and PNG buffer reused by the matplotlib renderers.
+# Not fork-safe: a forked worker must reset this before rendering.
+_TLS = threading.local()
+
+
+def _get_figure(figsize: Tuple[float, float]) -> Figure:
+    """Return this thread's cleared Figure at the requested size."""
+    fig = getattr(_TLS, 'figure', None)
+    if fig is None:
+        fig = Figure(figsize=figsize)
+        FigureCanvasAgg(fig)
+        _TLS.figure = fig
+    else:
+        fig.clear()
+        if tuple(fig.get_size_inches()) != tuple(figsize):
+            fig.set_size_inches(figsize)
+    return fig
+
+
+def _figure_to_base64(fig: Figure) -> str:
+    """Save the figure as PNG into this thread's buffer and return it base64 encoded."""
+    buffer = getattr(_TLS, 'buffer', None)
+    if buffer is None:
+        buffer = _TLS.buffer = io.BytesIO()
+    
+    fig.savefig(buffer, format='png', bbox_inches='tight', dpi=150)
+    image_base64 = base64.b64encode(buffer.getvalue()).decode('utf-8')
+    
+    # Reset for the next render and drop this figure's artists
+    buffer.seek(0)
+    buffer.truncate(0)
+    fig.clear()
+    return image_base64
+
+
+# Rendered outputs keyed on a content hash of the inputs
+_RENDER_CACHE_MAX_ENTRIES = 64
+_render_cache = OrderedDict()
+_render_cache_lock = threading.Lock()
+
+
+def _update_digest(digest, value):
+    """Feed one argument into a digest: arrays by dtype, shape and bytes, else by repr."""
+    if isinstance(value, np.ndarray):
+        digest.update(f"{value.dtype.str}{value.shape}".encode('utf-8'))
+        digest.update(np.ascontiguousarray(value).data)
+    else:
+        digest.update(repr(value).encode('utf-8'))
+
+
+def _content_key(name: str, args: tuple, kwargs: dict) -> bytes:
+    """Hash a call's arguments (array bytes, shapes and plain values) into a cache key."""
+    digest = hashlib.blake2b(name.encode('utf-8'), digest_size=16)
+    for value in args:
+        _update_digest(digest, value)
+    for key in sorted(kwargs):
+        digest.update(f"|{key}=".encode('utf-8'))
+        _update_digest(digest, kwargs[key])
+    return digest.digest()
+
+
+def _detached(result):
+    """Immutable renders (base64 str) are shared; anything else is deep-copied per caller."""
+    if isinstance(result, (str, bytes)):
+        return result
+    return copy.deepcopy(result)
+
+
+def _memoize_render(func):
+    """LRU-cache a deterministic visualizer method on the content of its arguments."""
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        key = _content_key(func.__name__, args, kwargs)
+        with _render_cache_lock:
+            if key in _render_cache:
+                _render_cache.move_to_end(key)
+                cached = _render_cache[key]
+                hit = True
+            else:
+                hit = False
+        if hit:
+            return _detached(cached)
+        
+        result = func(*args, **kwargs)
+        
+        with _render_cache_lock:
+            _render_cache[key] = result
+            if len(_render_cache) > _RENDER_CACHE_MAX_ENTRIES:
+                _render_cache.popitem(last=False)
+        # The caller must not hold the cached object itself (e.g. GeoJSON dicts)
+        return _detached(result)
+    return wrapper
+
+
 class NDVIVisualizer:
     """Generate visualizations for NDVI and stress zones"""
     
     @staticmethod
-    def create_ndvi_heatmap(ndvi_field: np.ndarray) -> str:
+    def clear_cache():
+        """Drop all memoized visualizations."""
+        with _render_cache_lock:
+            _render_cache.clear()
+    
+    @staticmethod
+    @_memoize_render
+    def create_ndvi_heatmap(ndvi_field: np.ndarray, annotate: bool = False) -> str:
         """
         Create NDVI heatmap visualization
         
         Args:
             ndvi_field: 100x100 NDVI array
+            annotate: Render title, colorbar and statistics with matplotlib
             
         Returns:
             str: Base64 encoded PNG image
         """
-        plt.figure(figsize=(10, 8))
+        if annotate:
+            return NDVIVisualizer._create_annotated_ndvi_heatmap(ndvi_field)
+        
+        return _encode_png(_ndvi_to_rgb(ndvi_field), Image.BILINEAR)
+    
+    @staticmethod
+    def _create_annotated_ndvi_heatmap(ndvi_field: np.ndarray) -> str:
+        """Render the NDVI heatmap with title, colorbar and statistics."""
+        fig = _get_figure((10, 8))
+        ax = fig.add_subplot()
         
-        # Create heatmap with RdYlGn colormap
-        im = plt.imshow(ndvi_field, cmap='RdYlGn', vmin=0, vmax=1, interpolation='bilinear')
+        # Create heatmap from the precomputed RdYlGn lookup table
+        ax.imshow(_ndvi_to_rgb(ndvi_field), interpolation='bilinear')
         
         # Add colorbar
-        cbar = plt.colorbar(im, label='NDVI Value')
+        cbar = fig.colorbar(ScalarMappable(norm=_NDVI_NORM, cmap=_RDYLGN_CMAP), ax=ax, label='NDVI Value')
         cbar.set_ticks([0, 0.2, 0.4, 0.6, 0.8, 1.0])
         cbar.set_ticklabels(['0.0\n(Bare)', '0.2\n(Sparse)', '0.4\n(Low)', 
                              '0.6\n(Moderate)', '0.8\n(Good)', '1.0\n(Dense)'])
         
-        plt.title('NDVI Vegetation Health Map', fontsize=14, fontweight='bold')
-        plt.xlabel('Distance (West → East)', fontsize=10)
-        plt.ylabel('Distance (South → North)', fontsize=10)
+        ax.set_title('NDVI Vegetation Health Map', fontsize=14, fontweight='bold')
+        ax.set_xlabel('Distance (West → East)', fontsize=10)
+        ax.set_ylabel('Distance (South → North)', fontsize=10)
         
         # Remove tick labels
-        plt.xticks([])
-        plt.yticks([])
+        ax.set_xticks([])
+        ax.set_yticks([])
         
         # Add statistics annotation
         stats_text = f'Mean: {np.mean(ndvi_field):.3f}\n'
         stats_text += f'Min: {np.min(ndvi_field):.3f}\n'
         stats_text += f'Max: {np.max(ndvi_field):.3f}'
-        plt.text(0.02, 0.98, stats_text, transform=plt.gca().transAxes,
+        ax.text(0.02, 0.98, stats_text, transform=ax.transAxes,
                 fontsize=9, verticalalignment='top',
                 bbox=dict(boxstyle='round', facecolor='white', alpha=0.8))
         
-        # Save to base64
-        buffer = io.BytesIO()
-        plt.savefig(buffer, format='png', bbox_inches='tight', dpi=150)
-        buffer.seek(0)
-        image_base64 = base64.b64encode(buffer.getvalue()).decode('utf-8')
-        plt.close()
-        
-        return image_base64
+        return _figure_to_base64(fig)
     
     @staticmethod
-    def create_stress_zone_map(zones: np.ndarray, stats: Dict) -> str:
+    @_memoize_render
+    def create_stress_zone_map(zones: np.ndarray, stats: Dict, annotate: bool = False) -> str:
         """
         Create stress zone visualization
         
         Args:
             zones: Classification array (0=critical, 1=high, 2=moderate, 3=healthy)
             stats: Zone statistics
+            annotate: Render title and legend with matplotlib
             
         Returns:
             str: Base64 encoded PNG image
         """
-        plt.figure(figsize=(10, 8))
+        if annotate:
+            return NDVIVisualizer._create_annotated_stress_zone_map(zones, stats)
         
-        # Define colors
-        colors = np.array([
-            [220/255, 38/255, 38/255],   # Critical - Red
-            [245/255, 158/255, 11/255],  # High - Orange
-            [252/255, 211/255, 77/255],  # Moderate - Yellow
-            [16/255, 185/255, 129/255]   # Healthy - Green
-        ])
+        return _encode_png(_STRESS_LUT[zones], Image.NEAREST)
+    
+    @staticmethod
+    def _create_annotated_stress_zone_map(zones: np.ndarray, stats: Dict) -> str:
+        """Render the stress zone map with title and percentage legend."""
+        fig = _get_figure((10, 8))
+        ax = fig.add_subplot()
         
-        # Create RGB image
-        rgb_image = colors[zones]
+        # Create RGB image (uint8 gather, no float intermediate)
+        rgb_image = _STRESS_LUT[zones]
         
         # Display
-        plt.imshow(rgb_image, interpolation='nearest')
+        ax.imshow(rgb_image, interpolation='nearest')
         
-        plt.title('Water Stress Zone Map', fontsize=14, fontweight='bold')
-        plt.xlabel('Distance (West → East)', fontsize=10)
-        plt.ylabel('Distance (South → North)', fontsize=10)
+        ax.set_title('Water Stress Zone Map', fontsize=14, fontweight='bold')
+        ax.set_xlabel('Distance (West → East)', fontsize=10)
+        ax.set_ylabel('Distance (South → North)', fontsize=10)
         
         # Remove ticks
-        plt.xticks([])
-        plt.yticks([])
+        ax.set_xticks([])
+        ax.set_yticks([])
         
         # Create legend with statistics
-        import matplotlib.patches as mpatches
         legend_elements = [
             mpatches.Patch(facecolor='#DC2626', edgecolor='black', 
                           label=f'🔴 Critical: {stats["critical"]["percentage"]:.1f}%'),
@@ -109,19 +260,13 @@ class NDVIVisualizer:
                           label=f'🟢 Healthy: {stats["healthy"]["percentage"]:.1f}%')
         ]
         
-        plt.legend(handles=legend_elements, loc='upper right', fontsize=9,
+        ax.legend(handles=legend_elements, loc='upper right', fontsize=9,
                   framealpha=0.9, edgecolor='black')
         
-        # Save to base64
-        buffer = io.BytesIO()
-        plt.savefig(buffer, format='png', bbox_inches='tight', dpi=150)
-        buffer.seek(0)
-        image_base64 = base64.b64encode(buffer.getvalue()).decode('utf-8')
-        plt.close()
-        
-        return image_base64
+        return _figure_to_base64(fig)
     
     @staticmethod
+    @_memoize_render
     def create_trend_chart(time_series: List[Dict]) -> str:
         """
         Create NDVI trend chart
@@ -132,26 +277,25 @@ class NDVIVisualizer:
         Returns:
             str: Base64 encoded PNG image
         """
-        plt.figure(figsize=(12, 6))
-        
-        # Extract data
-        dates = [item['date'] for item in time_series]
-        ndvi_values = [item['ndvi'] for item in time_series]
-        precip_values = [item.get('precipitation', 0) for item in time_series]
-        
-        # Format dates for display (show every 5th date)
-        date_labels = []
-        for i, d in enumerate(dates):
-            if i % 5 == 0:
-                # Convert YYYYMMDD to MMM DD
-                from datetime import datetime
-                dt = datetime.strptime(d, '%Y%m%d')
-                date_labels.append(dt.strftime('%b %d'))
-            else:
-                date_labels.append('')
+        # Extract data in a single pass
+        n_points = len(time_series)
+        dates = [None] * n_points
+        ndvi_values = np.empty(n_points, dtype=np.float64)
+        precip_values = np.empty(n_points, dtype=np.float64)
+        for i, item in enumerate(time_series):
+            dates[i] = item['date']
+            ndvi_values[i] = item['ndvi']
+            precip_values[i] = item.get('precipitation', 0)
+        
+        # Format dates for display (show every 5th date, YYYYMMDD -> MMM DD)
+        date_labels = [
+            datetime.strptime(d, '%Y%m%d').strftime('%b %d') if i % 5 == 0 else ''
+            for i, d in enumerate(dates)
+        ]
         
         # Create dual-axis plot
-        fig, ax1 = plt.subplots(figsize=(12, 6))
+        fig = _get_figure((12, 6))
+        ax1 = fig.add_subplot()
         
         # NDVI line
         color = 'tab:green'
@@ -178,19 +322,13 @@ class NDVIVisualizer:
             ax1.plot(range(len(dates)), p(range(len(dates))), 
                     "r--", alpha=0.5, linewidth=1, label='Trend')
         
-        plt.title('Vegetation Health Trend (30 Days)', fontsize=14, fontweight='bold')
+        ax1.set_title('Vegetation Health Trend (30 Days)', fontsize=14, fontweight='bold')
         fig.tight_layout()
         
-        # Save to base64
-        buffer = io.BytesIO()
-        plt.savefig(buffer, format='png', bbox_inches='tight', dpi=150)
-        buffer.seek(0)
-        image_base64 = base64.b64encode(buffer.getvalue()).decode('utf-8')
-        plt.close()
-        
-        return image_base64
+        return _figure_to_base64(fig)
     
     @staticmethod
+    @_memoize_render
     def generate_geojson(boundary_coords: List, ndvi_field: np.ndarray, zones: np.ndarray) -> Dict:
         """
         Generate GeoJSON representation of NDVI data
@@ -233,8 +371,14 @@ class NDVIVisualizer:
             zone_names = ['Critical', 'High', 'Moderate', 'Healthy']
             zone_colors = ['#DC2626', '#F59E0B', '#FCD34D', '#10B981']
             
+            # Per-zone pixel counts and NDVI sums in one pass each
+            flat_zones = zones.ravel().astype(np.intp, copy=False)
+            zone_counts = np.bincount(flat_zones, minlength=4)
+            zone_sums = np.bincount(flat_zones, weights=ndvi_field.ravel(), minlength=4)
+            zone_means = zone_sums / np.maximum(zone_counts, 1)
+            
             for i, name in enumerate(zone_names):
-                zone_pixels = np.sum(zones == i)
+                zone_pixels = zone_counts[i]
                 if zone_pixels > 0:
                     features.append({
                         "type": "Feature",
@@ -244,7 +388,7 @@ class NDVIVisualizer:
                             "level": i,
                             "color": zone_colors[i],
                             "percentage": float(zone_pixels / zones.size * 100),
-                            "mean_ndvi": float(np.mean(ndvi_field[zones == i]))
+                            "mean_ndvi": float(zone_means[i])
                         },
                         "geometry": {
                             "type": "Point",
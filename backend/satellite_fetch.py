@@ -3,8 +3,31 @@ import hashlib
 import numpy as np
 # from sentinelsat import SentinelAPI
 from datetime import datetime, timedelta
+from functools import lru_cache
 from config import CACHE_DIR, SAMPLE_DIR  # SENTINEL_USERNAME, SENTINEL_PASSWORD, MAX_CLOUD_COVER, DAYS_LOOKBACK
 
+@lru_cache(maxsize=8)
+def _edge_effect_masks(size):
+    """
+    Build the additive edge-effect masks for the red and NIR bands.
+    
+    Each 5-pixel edge strip adds 15 to red and 20 to NIR (corners count twice).
+    
+    Returns:
+        tuple: Read-only (red, nir) arrays to add to / subtract from the bands
+    """
+    edge_count = np.zeros(size)
+    edge_count[:5, :] += 1
+    edge_count[-5:, :] += 1
+    edge_count[:, :5] += 1
+    edge_count[:, -5:] += 1
+    edge_red = edge_count * 15
+    edge_nir = edge_count * 20
+    edge_red.flags.writeable = False
+    edge_nir.flags.writeable = False
+    return edge_red, edge_nir
+
+
 class SatelliteFetcher:
     def __init__(self):
         """Initialize the SatelliteFetcher with API credentials."""
@@ -80,7 +103,7 @@ class SatelliteFetcher:
             
         try:
             # Create hash for cache directory
-            cache_key = hashlib.md5(product_id.encode()).hexdigest()
+            cache_key = hashlib.blake2b(product_id.encode(), digest_size=16).hexdigest()
             product_cache_dir = os.path.join(CACHE_DIR, cache_key)
             os.makedirs(product_cache_dir, exist_ok=True)
             
@@ -131,9 +154,10 @@ class SatelliteFetcher:
         if field_boundary:
             location_seed = hash(str(field_boundary)) % 100000
         else:
-            location_seed = np.random.randint(0, 100000)
+            location_seed = None
         
-        np.random.seed(location_seed)
+        # Local generator: no global seed to set and restore across threads
+        rng = np.random.default_rng(location_seed)
         
         # Crop-specific reflectance values (realistic ranges from scientific literature)
         crop_profiles = {
@@ -151,46 +175,43 @@ class SatelliteFetcher:
         size = (100, 100)
         
         # Create base healthy vegetation
-        red_base = np.random.uniform(profile['red_range'][0], profile['red_range'][1], size=size)
-        nir_base = np.random.uniform(profile['nir_range'][0], profile['nir_range'][1], size=size)
+        red_base = rng.uniform(profile['red_range'][0], profile['red_range'][1], size=size)
+        nir_base = rng.uniform(profile['nir_range'][0], profile['nir_range'][1], size=size)
         
         # Add realistic stress patterns (water stress typically in patches)
-        num_stress_zones = np.random.randint(2, 6)  # 2-5 stress zones
-        
-        for _ in range(num_stress_zones):
-            # Random stress zone location
-            center_x = np.random.randint(20, 80)
-            center_y = np.random.randint(20, 80)
-            radius = np.random.randint(8, 25)
-            
-            # Create circular stress pattern
-            y, x = np.ogrid[:size[0], :size[1]]
-            mask = (x - center_x)**2 + (y - center_y)**2 <= radius**2
-            
-            # Stress reduces NIR and increases Red (less chlorophyll)
-            stress_intensity = np.random.uniform(0.3, 0.8)  # Variable stress levels
-            red_base[mask] += stress_intensity * 40  # Stressed plants reflect more red
-            nir_base[mask] -= stress_intensity * 50  # Stressed plants reflect less NIR
+        num_stress_zones = rng.integers(2, 6)  # 2-5 stress zones
+        
+        # Random stress zone locations, sizes and severities
+        centers_x = np.empty(num_stress_zones)
+        centers_y = np.empty(num_stress_zones)
+        radii = np.empty(num_stress_zones)
+        intensities = np.empty(num_stress_zones)
+        for k in range(num_stress_zones):
+            centers_x[k] = rng.integers(20, 80)
+            centers_y[k] = rng.integers(20, 80)
+            radii[k] = rng.integers(8, 25)
+            intensities[k] = rng.uniform(0.3, 0.8)  # Variable stress levels
+        
+        # Stamp all circular stress patterns at once; overlapping zones add up
+        y, x = np.ogrid[:size[0], :size[1]]
+        dist_sq = (x[..., None] - centers_x)**2 + (y[..., None] - centers_y)**2
+        stress = (dist_sq <= radii**2) @ intensities
+        
+        # Stress reduces NIR and increases Red (less chlorophyll)
+        red_base += stress * 40  # Stressed plants reflect more red
+        nir_base -= stress * 50  # Stressed plants reflect less NIR
         
         # Add edge effects (field edges often different)
-        red_base[:5, :] += 15  # Edge stress
-        red_base[-5:, :] += 15
-        red_base[:, :5] += 15
-        red_base[:, -5:] += 15
-        nir_base[:5, :] -= 20
-        nir_base[-5:, :] -= 20
-        nir_base[:, :5] -= 20
-        nir_base[:, -5:] -= 20
+        edge_red, edge_nir = _edge_effect_masks(size)
+        red_base += edge_red  # Edge stress
+        nir_base -= edge_nir
         
         # Add Gaussian noise for realism (sensor noise)
-        red_base += np.random.normal(0, 3, size=size)
-        nir_base += np.random.normal(0, 3, size=size)
+        red_base += rng.normal(0, 3, size=size)
+        nir_base += rng.normal(0, 3, size=size)
         
         # Ensure values stay in valid range
         red = np.clip(red_base, 50, 200).astype(np.float32)
         nir = np.clip(nir_base, 100, 255).astype(np.float32)
         
-        # Reset random seed to avoid affecting other operations
-        np.random.seed(None)
-        
         return red, nir
\ No newline at end of file
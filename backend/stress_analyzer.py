@@ -1,11 +1,23 @@
 import numpy as np
-import matplotlib
-matplotlib.use('Agg')  # Use non-interactive backend for thread safety
-import matplotlib.pyplot as plt
 import io
 import base64
+from PIL import Image
 from config import NDVI_CRITICAL, NDVI_HIGH_STRESS, NDVI_MODERATE, NDVI_HEALTHY
 
+# Zone colors: red (critical), orange (high), yellow (moderate), green (healthy)
+STRESS_MAP_COLORS = np.array([
+    [255, 0, 0],
+    [255, 165, 0],
+    [255, 255, 0],
+    [0, 255, 0]
+], dtype=np.uint8)
+
+# (row, col) of each quadrant in the 2x2 block view of the field
+QUADRANT_POSITIONS = {'NW': (0, 0), 'NE': (0, 1), 'SW': (1, 0), 'SE': (1, 1)}
+
+# Nearest-neighbour upscale so each zone pixel stays crisp when displayed
+STRESS_MAP_SCALE = 4
+
 class StressAnalyzer:
     def detect_stress_zones(self, ndvi, weather=None):
         """
@@ -33,12 +45,11 @@ class StressAnalyzer:
             high_stress_threshold *= 0.85
             moderate_threshold *= 0.9
         
-        # Classify pixels into stress zones
-        zones = np.zeros_like(ndvi, dtype=int)
-        zones[ndvi < critical_threshold] = 0  # Critical stress
-        zones[(ndvi >= critical_threshold) & (ndvi < high_stress_threshold)] = 1  # High stress
-        zones[(ndvi >= high_stress_threshold) & (ndvi < moderate_threshold)] = 2  # Moderate stress
-        zones[ndvi >= moderate_threshold] = 3  # Healthy
+        # Classify pixels into stress zones in a single pass:
+        # 0 below critical, 1 below high stress, 2 below moderate, 3 healthy
+        thresholds = np.array([critical_threshold, high_stress_threshold, moderate_threshold],
+                              dtype=ndvi.dtype)
+        zones = np.digitize(ndvi, thresholds).astype(np.uint8)
         
         return zones
     
@@ -59,18 +70,17 @@ class StressAnalyzer:
         zone_names = ['Critical', 'High', 'Moderate', 'Healthy']
         zone_colors = ['red', 'orange', 'yellow', 'green']
         
+        # Per-zone pixel counts and NDVI sums in one pass each
+        flat_zones = zones.ravel()
+        counts = np.bincount(flat_zones, minlength=4)
+        sums = np.bincount(flat_zones, weights=ndvi.ravel(), minlength=4)
+        means = np.divide(sums, counts, out=np.zeros(len(counts)), where=counts > 0)
+        percentages = counts * (100.0 / total_pixels)
+        
         for i, name in enumerate(zone_names):
-            zone_pixels = np.sum(zones == i)
-            zone_percentage = (zone_pixels / total_pixels) * 100
-            
-            if zone_pixels > 0:
-                zone_ndvi_mean = np.mean(ndvi[zones == i])
-            else:
-                zone_ndvi_mean = 0
-            
             zone_stats[name] = {
-                'percentage': float(zone_percentage),
-                'mean_ndvi': float(zone_ndvi_mean),
+                'percentage': float(percentages[i]),
+                'mean_ndvi': float(means[i]),
                 'color': zone_colors[i]
             }
         
@@ -92,6 +102,20 @@ class StressAnalyzer:
         mid_h = height // 2
         mid_w = width // 2
         
+        if height % 2 == 0 and width % 2 == 0 and height > 0 and width > 0:
+            # Even grid: view it as 2x2 blocks and reduce all quadrants at once
+            blocks = ndvi.reshape(2, mid_h, 2, mid_w)
+            mean_q = blocks.mean(axis=(1, 3))
+            stressed_q = np.count_nonzero(blocks < NDVI_MODERATE, axis=(1, 3)) * (100.0 / (mid_h * mid_w))
+            
+            return {
+                name: {
+                    'mean_ndvi': float(mean_q[row, col]),
+                    'stressed_percentage': float(stressed_q[row, col])
+                }
+                for name, (row, col) in QUADRANT_POSITIONS.items()
+            }
+        
         # Extract quadrants
         nw = ndvi[:mid_h, :mid_w]
         ne = ndvi[:mid_h, mid_w:]
@@ -133,39 +157,16 @@ class StressAnalyzer:
         Returns:
             str: Base64 encoded PNG image
         """
-        # Define colors for each zone
-        colors = np.array([
-            [1.0, 0.0, 0.0],  # Red - Critical stress
-            [1.0, 0.65, 0.0], # Orange - High stress
-            [1.0, 1.0, 0.0],  # Yellow - Moderate stress
-            [0.0, 1.0, 0.0]   # Green - Healthy
-        ])
-        
-        # Create RGB image from zones
-        rgb_image = colors[zones]
-        
-        # Create figure
-        plt.figure(figsize=(10, 8))
-        plt.imshow(rgb_image)
-        plt.title('Water Stress Zones')
-        plt.xlabel('Pixel')
-        plt.ylabel('Pixel')
-        
-        # Create custom legend
-        import matplotlib.patches as mpatches
-        legend_patches = [
-            mpatches.Patch(color='red', label='Critical Stress'),
-            mpatches.Patch(color='orange', label='High Stress'),
-            mpatches.Patch(color='yellow', label='Moderate Stress'),
-            mpatches.Patch(color='green', label='Healthy')
-        ]
-        plt.legend(handles=legend_patches, loc='upper right')
+        # Map each zone straight to its color and encode the PNG
+        rgb_image = STRESS_MAP_COLORS[zones]
+        height, width = rgb_image.shape[:2]
+        image = Image.fromarray(rgb_image).resize(
+            (width * STRESS_MAP_SCALE, height * STRESS_MAP_SCALE), Image.NEAREST
+        )
         
         # Save to base64 string
         buffer = io.BytesIO()
-        plt.savefig(buffer, format='png', bbox_inches='tight')
-        buffer.seek(0)
+        image.save(buffer, format='PNG', optimize=False)
         image_base64 = base64.b64encode(buffer.getvalue()).decode('utf-8')
-        plt.close()
         
-        return image_base64
\ No newline at end of file
+        return image_base64
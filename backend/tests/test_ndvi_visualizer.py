@@ -0,0 +1,42 @@
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from satellite.ndvi_visualizer import NDVIVisualizer
+
+
+def test_heatmap_cache_distinguishes_keyword_arrays():
+    NDVIVisualizer.clear_cache()
+    rng = np.random.default_rng(0)
+    field_a = rng.uniform(0.0, 0.6, (100, 100))
+    # Differ only in the middle, which numpy's summarized repr leaves out
+    field_b = field_a.copy()
+    field_b[40:60, 40:60] += 0.3
+    
+    image_a = NDVIVisualizer.create_ndvi_heatmap(ndvi_field=field_a)
+    image_b = NDVIVisualizer.create_ndvi_heatmap(ndvi_field=field_b)
+    
+    assert image_a != image_b
+    assert NDVIVisualizer.create_ndvi_heatmap(ndvi_field=field_a) == image_a
+
+
+def test_cached_geojson_is_not_shared_with_callers():
+    NDVIVisualizer.clear_cache()
+    rng = np.random.default_rng(1)
+    ndvi_field = rng.uniform(0.0, 0.9, (100, 100))
+    zones = np.digitize(ndvi_field, [0.2, 0.4, 0.6]).astype(np.uint8)
+    boundary = [[10.0, 78.0], [10.01, 78.0], [10.01, 78.01], [10.0, 78.01], [10.0, 78.0]]
+    
+    first = NDVIVisualizer.generate_geojson(boundary, ndvi_field, zones)
+    expected_features = len(first['features'])
+    first['features'].clear()
+    
+    second = NDVIVisualizer.generate_geojson(boundary, ndvi_field, zones)
+    assert len(second['features']) == expected_features
+    second['features'].clear()
+    
+    third = NDVIVisualizer.generate_geojson(boundary, ndvi_field, zones)
+    assert len(third['features']) == expected_features
@@ -3,6 +3,12 @@ import json
 import numpy as np
 from datetime import datetime
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 def calculate_field_area(boundary):
     """
     Calculate the approximate area of a field based on its boundary coordinates.
@@ -26,7 +32,7 @@ def calculate_field_area(boundary):
     x = coords[:, 1]  # longitude
     y = coords[:, 0]  # latitude
     
-    area = 0.5 * np.abs(np.dot(x, np.roll(y, 1)) - np.dot(y, np.roll(x, 1)))
+    area = 0.5 * np.abs(np.sum(x[:-1] * y[1:] - x[1:] * y[:-1]) + x[-1] * y[0] - x[0] * y[-1])
     
     # Convert to hectares (simplified - in reality, this would depend on location)
     # 1 degree latitude ≈ 111 km, but this varies with longitude
@@ -37,16 +43,19 @@ def calculate_field_area(boundary):
 
 def generate_cache_key(data):
     """
-    Generate a cache key for data using MD5 hash.
+    Generate a cache key for data using a 16-byte BLAKE2b hash.
     
     Args:
         data (dict): Data to generate cache key for
         
     Returns:
-        str: MD5 hash of the data as hex string
+        str: BLAKE2b hash of the data as hex string
     """
-    data_str = json.dumps(data, sort_keys=True)
-    return hashlib.md5(data_str.encode()).hexdigest()
+    if ORJSON_AVAILABLE:
+        data_bytes = orjson.dumps(data, option=orjson.OPT_SORT_KEYS)
+    else:
+        data_bytes = json.dumps(data, sort_keys=True).encode()
+    return hashlib.blake2b(data_bytes, digest_size=16).hexdigest()
 
 def format_timestamp():
     """
@@ -70,18 +79,20 @@ def validate_boundary(boundary):
     if not boundary or len(boundary) < 3:
         return False
     
-    # Check that all points are valid coordinates
-    for point in boundary:
-        if not isinstance(point, list) or len(point) != 2:
-            return False
-        lat, lon = point
-        if not (-90 <= lat <= 90) or not (-180 <= lon <= 180):
-            return False
+    # Ragged or non-numeric points fail the conversion to a float array
+    try:
+        coords = np.asarray(boundary, dtype=np.float64)
+    except (ValueError, TypeError):
+        return False
     
-    # Check that the polygon is closed (first and last points are the same)
-    first_point = boundary[0]
-    last_point = boundary[-1]
-    if first_point[0] != last_point[0] or first_point[1] != last_point[1]:
+    if coords.ndim != 2 or coords.shape[1] != 2:
         return False
     
-    return True
\ No newline at end of file
+    # Check that all points are valid coordinates
+    lat = coords[:, 0]
+    lon = coords[:, 1]
+    if not ((lat >= -90) & (lat <= 90) & (lon >= -180) & (lon <= 180)).all():
+        return False
+    
+    # Check that the polygon is closed (first and last points are the same)
+    return bool(np.array_equal(coords[0], coords[-1]))
\ No newline at end of file
@@ -1,9 +1,338 @@
+import asyncio
+import json
+import logging
+import os
+import numpy as np
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
 import requests
-import random
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import math
+import threading
+import time
+from datetime import date
+from functools import lru_cache
 from config import OPENWEATHER_API_KEY
 
+logger = logging.getLogger(__name__)
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+try:
+    import aiohttp
+    AIOHTTP_AVAILABLE = True
+except ImportError:
+    AIOHTTP_AVAILABLE = False
+
+try:
+    from diskcache import Cache
+    DISKCACHE_AVAILABLE = True
+except ImportError:
+    DISKCACHE_AVAILABLE = False
+
+# Nearby queries within this distance reuse a cached API response
+WEATHER_CACHE_TOLERANCE_KM = 2.0
+WEATHER_CACHE_TTL = 600  # seconds
+# Background refresh pass period; well under the TTL so fresh entries are skipped
+WEATHER_PREFETCH_INTERVAL = WEATHER_CACHE_TTL // 4
+# Stale entries are kept this long as a last-known value when the API fails
+WEATHER_LAST_KNOWN_MAX_AGE = 6 * 60 * 60
+EARTH_RADIUS_KM = 6371.0088
+
+# Returned when the API key is missing or a request fails. Shared by every
+# call (like cached responses), so callers must treat it as read-only; it stays
+# a plain dict because it is passed straight to jsonify.
+_SAMPLE_WEATHER = {
+    'temperature': 25.5,
+    'humidity': 65,
+    'description': 'Clear sky',
+    'wind_speed': 3.2,
+    'wind_direction': 180
+}
+
+# Extra water per unit share of the Critical, High and Moderate stress zones
+STRESS_ZONE_NAMES = ('Critical', 'High', 'Moderate')
+STRESS_ZONE_WEIGHTS = np.array([0.8, 0.5, 0.2])
+
+# Low-NDVI multipliers: below 0.3 needs 50% more water, below 0.5 needs 20% more
+NDVI_FACTOR_THRESHOLDS = np.array([0.3, 0.5])
+NDVI_FACTORS = np.array([1.5, 1.2, 1.0])
+
+DAYS_PER_WEEK = 7
+
+# Deficit status buckets: <= 25 mm Low, <= 40 mm Moderate, above that High
+DEFICIT_THRESHOLDS = np.array([25.0, 40.0])
+DEFICIT_STATUS = np.array(["Low", "Moderate", "High"])
+
+# Persistent cache (when diskcache is installed) so restarts don't re-hit the API
+WEATHER_DISK_CACHE_DIR = os.getenv('WEATHER_CACHE_DIR', os.path.join(tempfile.gettempdir(), 'aquaadvisor_weather'))
+WEATHER_DISK_CACHE_TTL = 60 * 60  # one hour bucket
+_disk_cache = None
+_disk_cache_lock = threading.Lock()
+
+def _get_disk_cache():
+    """Open the on-disk weather cache on first use; None without diskcache."""
+    global _disk_cache
+    if not DISKCACHE_AVAILABLE:
+        return None
+    if _disk_cache is None:
+        with _disk_cache_lock:
+            if _disk_cache is None:
+                _disk_cache = Cache(WEATHER_DISK_CACHE_DIR)
+    return _disk_cache
+
+def _demo_rainfall(lats, lons, days, day):
+    """
+    Deterministic pseudo-random rainfall in [0, 50) mm per location and day.
+    
+    Hashes the ~100 m coordinate tile, period and day with the splitmix64
+    finalizer, so a value never changes within a day and whole arrays of
+    locations are computed at once.
+    
+    Returns:
+        numpy.ndarray: Rainfall in mm, one value per location
+    """
+    lat_q = np.round(np.atleast_1d(np.asarray(lats, dtype=np.float64)) * 1000).astype(np.int64)
+    lon_q = np.round(np.atleast_1d(np.asarray(lons, dtype=np.float64)) * 1000).astype(np.int64)
+    z = (lat_q.astype(np.uint64) * np.uint64(0x9E3779B97F4A7C15)) ^ (lon_q.astype(np.uint64) * np.uint64(0xC2B2AE3D27D4EB4F))
+    z ^= np.uint64(days * 1000003 + day)
+    z += np.uint64(0x9E3779B97F4A7C15)
+    z = (z ^ (z >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    z = (z ^ (z >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    z ^= z >> np.uint64(31)
+    return (z >> np.uint64(11)).astype(np.float64) * (50.0 / 2.0 ** 53)
+
+@lru_cache(maxsize=2048)
+def _et0_from_qtemp(qtemp):
+    """
+    Simplified Hargreaves ET0 in mm/day for a temperature quantized to 0.1 Celsius.
+    
+    ET0 barely moves within 0.1 degree, so keying the cache on tenths of a
+    degree lets nearly every call after warm-up skip the arithmetic.
+    """
+    temp = qtemp / 10.0
+    return max(0.0, 0.0023 * (temp + 17.8) * math.sqrt(temp) * 5.0)
+
+# Pooled keep-alive session for OpenWeatherMap requests
+_SESSION = requests.Session()
+_SESSION.headers['Connection'] = 'keep-alive'
+_RETRY = Retry(
+    total=3,
+    backoff_factor=0.3,
+    status_forcelist=[429, 500, 502, 503, 504],
+    allowed_methods=["GET"]
+)
+_SESSION.mount('http://', HTTPAdapter(pool_connections=4, pool_maxsize=16, max_retries=_RETRY))
+_SESSION.mount('https://', HTTPAdapter(pool_connections=4, pool_maxsize=16, max_retries=_RETRY))
+
+OPENWEATHER_URL = "http://api.openweathermap.org/data/2.5/weather"
+
+def _weather_params(lat, lon):
+    """Query parameters for an OpenWeatherMap current weather request."""
+    return {
+        'lat': lat,
+        'lon': lon,
+        'appid': OPENWEATHER_API_KEY,
+        'units': 'metric'
+    }
+
+def _new_aio_session():
+    """
+    Open a pooled aiohttp session.
+    
+    Use it with `async with` so the session and its connector are closed
+    before the event loop finishes.
+    """
+    return aiohttp.ClientSession(
+        connector=aiohttp.TCPConnector(limit=32, keepalive_timeout=60),
+        timeout=aiohttp.ClientTimeout(total=13.05, connect=3.05)
+    )
+
+def _json_loads(raw):
+    """Parse JSON bytes, with orjson when available."""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+def _parse_weather(data):
+    """
+    Extract the fields we use from an OpenWeatherMap current weather payload.
+    
+    Args:
+        data (dict): Parsed API response
+        
+    Returns:
+        dict: Weather data including temperature, humidity, description, wind
+    """
+    return {
+        'temperature': data['main']['temp'],
+        'humidity': data['main']['humidity'],
+        'description': data['weather'][0]['description'],
+        'wind_speed': data['wind']['speed'] if 'wind' in data else 0,
+        'wind_direction': data['wind']['deg'] if 'wind' in data and 'deg' in data['wind'] else 0
+    }
+
+# North-south extent of one 0.01 degree weather tile
+TILE_SIZE_KM = EARTH_RADIUS_KM * math.radians(0.01)
+
+def _haversine_km(lat1, lon1, lat2, lon2):
+    """
+    Great-circle distance between two points.
+    
+    Returns:
+        float: Distance in kilometers
+    """
+    phi1 = math.radians(lat1)
+    phi2 = math.radians(lat2)
+    dphi = phi2 - phi1
+    dlambda = math.radians(lon2 - lon1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlambda / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(a))
+
+def _weather_tile(lat, lon):
+    """Round coordinates down to a 0.01 degree (~1 km) tile."""
+    return math.floor(lat * 100), math.floor(lon * 100)
+
 class WeatherService:
+    # (lat tile, lon tile) -> (lat, lon, weather, fetched_at), shared by all instances
+    _cache = {}
+    _cache_lock = threading.Lock()
+    
+    def _get_cached_weather(self, lat, lon):
+        """
+        Look up a fresh cached response near the given coordinates.
+        
+        Checks the coordinate's tile and enough neighbouring tiles to cover
+        WEATHER_CACHE_TOLERANCE_KM (longitude tiles narrow away from the equator).
+        
+        Args:
+            lat (float): Latitude
+            lon (float): Longitude
+            
+        Returns:
+            dict: Cached weather data, or None on a miss
+        """
+        tile_lat, tile_lon = _weather_tile(lat, lon)
+        lat_span = math.ceil(WEATHER_CACHE_TOLERANCE_KM / TILE_SIZE_KM)
+        lon_span = math.ceil(lat_span / max(math.cos(math.radians(lat)), 0.01))
+        now = time.time()
+        with self._cache_lock:
+            for d_lat in range(-lat_span, lat_span + 1):
+                for d_lon in range(-lon_span, lon_span + 1):
+                    entry = self._cache.get((tile_lat + d_lat, tile_lon + d_lon))
+                    if entry is None:
+                        continue
+                    cached_lat, cached_lon, weather, fetched_at = entry
+                    if now - fetched_at >= WEATHER_CACHE_TTL:
+                        continue
+                    if _haversine_km(lat, lon, cached_lat, cached_lon) <= WEATHER_CACHE_TOLERANCE_KM:
+                        return weather
+        
+        disk_cache = _get_disk_cache()
+        if disk_cache is None:
+            return None
+        weather = disk_cache.get(self._disk_weather_key(lat, lon))
+        if weather is not None:
+            with self._cache_lock:
+                self._cache[_weather_tile(lat, lon)] = (lat, lon, weather, now)
+        return weather
+    
+    @staticmethod
+    def _disk_weather_key(lat, lon):
+        """Persistent cache key: ~100 m tile plus the current hour."""
+        return ('weather', round(float(lat), 3), round(float(lon), 3), int(time.time() // WEATHER_DISK_CACHE_TTL))
+    
+    def _store_cached_weather(self, lat, lon, weather):
+        """Store an API response under its tile, dropping entries too old to fall back on."""
+        now = time.time()
+        with self._cache_lock:
+            expired = [key for key, entry in self._cache.items() if now - entry[3] >= WEATHER_LAST_KNOWN_MAX_AGE]
+            for key in expired:
+                del self._cache[key]
+            self._cache[_weather_tile(lat, lon)] = (lat, lon, weather, now)
+        
+        disk_cache = _get_disk_cache()
+        if disk_cache is not None:
+            disk_cache.set(self._disk_weather_key(lat, lon), weather, expire=WEATHER_DISK_CACHE_TTL)
+    
+    def _fallback_weather(self, lat, lon):
+        """Last known weather for this tile, even if stale, else the sample weather."""
+        with self._cache_lock:
+            entry = self._cache.get(_weather_tile(lat, lon))
+        if entry is not None:
+            return entry[2]
+        return _SAMPLE_WEATHER
+    
+    def _cached_weather_age(self, lat, lon):
+        """Seconds since the weather for this tile was fetched, or None if not cached."""
+        with self._cache_lock:
+            entry = self._cache.get(_weather_tile(lat, lon))
+        if entry is None:
+            return None
+        return time.time() - entry[3]
+    
+    def start_prefetcher(self, farm_coords, interval=WEATHER_PREFETCH_INTERVAL):
+        """
+        Keep the weather cache warm for known farm locations in the background.
+        
+        Every interval seconds, refetches each weather tile whose cached entry is
+        missing or would expire before the next run, so request handlers find
+        a fresh entry instead of calling the API themselves. Farms sharing a
+        tile are fetched once.
+        
+        Args:
+            farm_coords (list): (lat, lon) pairs to keep warm
+            interval (int): Seconds between refresh passes, below WEATHER_CACHE_TTL
+        """
+        if interval >= WEATHER_CACHE_TTL:
+            raise ValueError(f"Prefetch interval must be below the {WEATHER_CACHE_TTL}s cache TTL")
+        
+        if not OPENWEATHER_API_KEY:
+            return
+        
+        self.stop_prefetcher()
+        # One representative coordinate per weather tile
+        tile_coords = {}
+        for lat, lon in farm_coords:
+            lat, lon = float(lat), float(lon)
+            tile_coords.setdefault(_weather_tile(lat, lon), (lat, lon))
+        coords = list(tile_coords.values())
+        stopped = threading.Event()
+        self._prefetch_stopped = stopped
+        
+        def refresh():
+            for lat, lon in coords:
+                if stopped.is_set():
+                    return
+                age = self._cached_weather_age(lat, lon)
+                if age is None or age + interval >= WEATHER_CACHE_TTL:
+                    self._fetch_current_weather(lat, lon)
+            
+            if stopped.is_set():
+                return
+            self._prefetch_timer = threading.Timer(interval, refresh)
+            self._prefetch_timer.daemon = True
+            self._prefetch_timer.start()
+        
+        self._prefetch_timer = threading.Timer(0, refresh)
+        self._prefetch_timer.daemon = True
+        self._prefetch_timer.start()
+    
+    def stop_prefetcher(self):
+        """Cancel the background weather prefetch started by start_prefetcher."""
+        stopped = getattr(self, '_prefetch_stopped', None)
+        if stopped is not None:
+            stopped.set()
+        timer = getattr(self, '_prefetch_timer', None)
+        if timer is not None:
+            timer.cancel()
+            self._prefetch_timer = None
+    
     def get_current_weather(self, lat, lon):
         """
         Get current weather data from OpenWeatherMap API.
@@ -17,46 +346,80 @@ class WeatherService:
         """
         if not OPENWEATHER_API_KEY:
             # Return sample data if API key is not configured
-            return {
-                'temperature': 25.5,
-                'humidity': 65,
-                'description': 'Clear sky',
-                'wind_speed': 3.2,
-                'wind_direction': 180
-            }
+            return _SAMPLE_WEATHER
         
-        try:
-            url = f"http://api.openweathermap.org/data/2.5/weather"
-            params = {
-                'lat': lat,
-                'lon': lon,
-                'appid': OPENWEATHER_API_KEY,
-                'units': 'metric'
-            }
+        cached = self._get_cached_weather(lat, lon)
+        if cached is not None:
+            return cached
+        
+        return self._fetch_current_weather(lat, lon)
+    
+    def _fetch_current_weather(self, lat, lon):
+        """
+        Request current weather from OpenWeatherMap, bypassing the cache lookup.
+        
+        Args:
+            lat (float): Latitude
+            lon (float): Longitude
             
-            response = requests.get(url, params=params)
+        Returns:
+            dict: Weather data, or the last known/sample weather if the request fails
+        """
+        try:
+            response = _SESSION.get(OPENWEATHER_URL, params=_weather_params(lat, lon), timeout=(3.05, 10))
             response.raise_for_status()
-            data = response.json()
-            
-            weather = {
-                'temperature': data['main']['temp'],
-                'humidity': data['main']['humidity'],
-                'description': data['weather'][0]['description'],
-                'wind_speed': data['wind']['speed'] if 'wind' in data else 0,
-                'wind_direction': data['wind']['deg'] if 'wind' in data and 'deg' in data['wind'] else 0
-            }
+            return self._weather_from_payload(lat, lon, response.content)
+        except Exception as e:
+            return self._weather_request_failed(lat, lon, e)
+    
+    def _weather_from_payload(self, lat, lon, raw):
+        """Parse a raw API response body and cache the resulting weather."""
+        weather = _parse_weather(_json_loads(raw))
+        self._store_cached_weather(lat, lon, weather)
+        return weather
+    
+    def _weather_request_failed(self, lat, lon, error):
+        """Log a failed request and return the last known value for this tile, or sample data."""
+        logger.warning("Weather API request failed: %s", error, exc_info=True)
+        return self._fallback_weather(lat, lon)
+    
+    async def get_current_weather_async(self, lat, lon, session=None):
+        """
+        Asynchronous version of get_current_weather for concurrent multi-field queries.
+        
+        Uses aiohttp when it is installed, otherwise runs the synchronous
+        request in a worker thread.
+        
+        Args:
+            lat (float): Latitude
+            lon (float): Longitude
+            session (aiohttp.ClientSession, optional): Session to reuse across
+                calls; a short-lived one is opened and closed if omitted
             
-            return weather
+        Returns:
+            dict: Weather data including temperature, humidity, description, wind
+        """
+        if not OPENWEATHER_API_KEY or not AIOHTTP_AVAILABLE:
+            return await asyncio.to_thread(self.get_current_weather, lat, lon)
+        
+        cached = self._get_cached_weather(lat, lon)
+        if cached is not None:
+            return cached
+        
+        if session is None:
+            async with _new_aio_session() as session:
+                return await self._fetch_current_weather_async(lat, lon, session)
+        return await self._fetch_current_weather_async(lat, lon, session)
+    
+    async def _fetch_current_weather_async(self, lat, lon, session):
+        """Asynchronous _fetch_current_weather over an open aiohttp session."""
+        try:
+            async with session.get(OPENWEATHER_URL, params=_weather_params(lat, lon)) as response:
+                response.raise_for_status()
+                raw = await response.read()
+            return self._weather_from_payload(lat, lon, raw)
         except Exception as e:
-            print(f"Weather API request failed: {e}")
-            # Return sample data on failure
-            return {
-                'temperature': 25.5,
-                'humidity': 65,
-                'description': 'Clear sky',
-                'wind_speed': 3.2,
-                'wind_direction': 180
-            }
+            return self._weather_request_failed(lat, lon, e)
     
     def estimate_rainfall(self, lat, lon, days=7):
         """
@@ -71,8 +434,23 @@ class WeatherService:
             float: Estimated total rainfall in mm
         """
         # In a real implementation, this would use historical data or forecasts
-        # For demo purposes, we'll generate a random value between 0-50mm
-        return random.uniform(0, 50)
+        # For demo purposes, we generate a value between 0-50mm that is stable
+        # for the same location and day, so repeated calls agree
+        return float(_demo_rainfall(lat, lon, days, date.today().toordinal())[0])
+    
+    def estimate_rainfall_batch(self, lats, lons, days=7):
+        """
+        Vectorized estimate_rainfall for many locations at once.
+        
+        Args:
+            lats (numpy.ndarray): Latitudes
+            lons (numpy.ndarray): Longitudes
+            days (int): Number of days to estimate rainfall for
+            
+        Returns:
+            numpy.ndarray: Estimated total rainfall in mm per location
+        """
+        return _demo_rainfall(lats, lons, days, date.today().toordinal())
     
     def calculate_et0(self, weather):
         """
@@ -87,13 +465,31 @@ class WeatherService:
         try:
             temp = weather['temperature']
             # Simplified Hargreaves equation: 0.0023 * (T + 17.8) * sqrt(T) * 5
-            # Where T is average temperature in Celsius
-            et0 = 0.0023 * (temp + 17.8) * math.sqrt(temp) * 5
-            return max(0, et0)  # Ensure non-negative value
+            # Where T is average temperature in Celsius, rounded to 0.1 (clamped to non-negative)
+            return _et0_from_qtemp(int(round(temp * 10)))
         except Exception as e:
-            print(f"ET0 calculation failed: {e}")
+            logger.warning("ET0 calculation failed: %s", e)
             return 5.0  # Return default value on error
     
+    def calculate_et0_batch(self, temps):
+        """
+        Vectorized calculate_et0 for many fields at once.
+        
+        Args:
+            temps (numpy.ndarray): Average temperatures in Celsius
+            
+        Returns:
+            numpy.ndarray: Reference evapotranspiration (ET0) in mm/day
+        """
+        # Same 0.1 degree quantization as the scalar path
+        # (adding 0.0 turns -0.0 from rounding small negatives into 0.0)
+        temps = np.round(np.asarray(temps, dtype=np.float64) * 10) / 10.0 + 0.0
+        # Negative temperatures have no real sqrt; use the scalar path's 5.0 default
+        valid = temps >= 0
+        safe_temps = np.where(valid, temps, 0.0)
+        et0 = np.maximum(0.0, 0.0023 * (safe_temps + 17.8) * np.sqrt(safe_temps) * 5)
+        return np.where(valid, et0, 5.0)
+    
     def assess_water_deficit(self, lat, lon, ndvi_mean=None, zone_stats=None):
         """
         Assess water deficit based on ET0, rainfall, and NDVI stress levels.
@@ -113,9 +509,147 @@ class WeatherService:
         # Estimate rainfall for the next 7 days
         rainfall = self.estimate_rainfall(lat, lon, days=7)
         
+        return self._water_deficit(weather, rainfall, ndvi_mean, zone_stats)
+    
+    async def assess_water_deficit_async(self, lat, lon, ndvi_mean=None, zone_stats=None, session=None):
+        """
+        Asynchronous version of assess_water_deficit.
+        
+        The weather request does not block the event loop; see
+        assess_water_deficit_batch_async for many fields at once.
+        
+        Args:
+            lat (float): Latitude
+            lon (float): Longitude
+            ndvi_mean (float): Mean NDVI value of the field
+            zone_stats (dict): Statistics for each stress zone
+            session (aiohttp.ClientSession, optional): Session to reuse across calls
+            
+        Returns:
+            dict: Water deficit assessment including status and mm
+        """
+        weather = await self.get_current_weather_async(lat, lon, session=session)
+        rainfall = self.estimate_rainfall(lat, lon, days=7)
+        
+        return self._water_deficit(weather, rainfall, ndvi_mean, zone_stats)
+    
+    async def assess_water_deficit_batch_async(self, fields):
+        """
+        Assess water deficit for many fields with concurrent weather requests.
+        
+        All requests share one aiohttp session, which is closed before returning.
+        
+        Args:
+            fields (list): Dicts with 'lat', 'lon' and optional 'ndvi_mean', 'zone_stats'
+            
+        Returns:
+            list: Water deficit assessments, in the same order as fields
+        """
+        async def assess_all(session):
+            return list(await asyncio.gather(*[
+                self.assess_water_deficit_async(
+                    field['lat'], field['lon'], field.get('ndvi_mean'), field.get('zone_stats'),
+                    session=session
+                )
+                for field in fields
+            ]))
+        
+        if not OPENWEATHER_API_KEY or not AIOHTTP_AVAILABLE:
+            return await assess_all(None)
+        async with _new_aio_session() as session:
+            return await assess_all(session)
+    
+    def assess_water_deficit_batch(self, fields, max_workers=8):
+        """
+        Assess water deficit for many fields with one vectorized computation.
+        
+        Fields in the same weather tile share a single weather fetch, and
+        distinct tiles are fetched concurrently.
+        
+        Args:
+            fields (list): Dicts with 'lat', 'lon' and optional 'ndvi_mean', 'zone_stats'
+            max_workers (int): Maximum number of concurrent weather requests
+            
+        Returns:
+            list: Water deficit assessments, in the same order as fields
+        """
+        n_fields = len(fields)
+        if n_fields == 0:
+            return []
+        
+        # One weather request per tile, fanned out to every field in it
+        field_tiles = [_weather_tile(field['lat'], field['lon']) for field in fields]
+        tile_coords = {}
+        for tile, field in zip(field_tiles, fields):
+            tile_coords.setdefault(tile, (field['lat'], field['lon']))
+        
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(tile_coords))) as executor:
+            futures = {
+                tile: executor.submit(self.get_current_weather, lat, lon)
+                for tile, (lat, lon) in tile_coords.items()
+            }
+            tile_weather = {tile: future.result() for tile, future in futures.items()}
+        
+        temps = np.empty(n_fields)
+        ndvi_mean = np.ones(n_fields)
+        stress_pct = np.zeros((n_fields, 3))
+        adjusted = np.zeros(n_fields, dtype=bool)
+        
+        for i, field in enumerate(fields):
+            temps[i] = tile_weather[field_tiles[i]]['temperature']
+            
+            zone_stats = field.get('zone_stats')
+            if field.get('ndvi_mean') is not None and zone_stats is not None:
+                adjusted[i] = True
+                ndvi_mean[i] = field['ndvi_mean']
+                for j, name in enumerate(STRESS_ZONE_NAMES):
+                    stress_pct[i, j] = zone_stats.get(name, {}).get('percentage', 0)
+        
+        rainfall = self.estimate_rainfall_batch(
+            [field['lat'] for field in fields], [field['lon'] for field in fields], days=7
+        )
+        
+        # Calculate ET0 for 7 days and the base deficit
+        et0_weekly = self.calculate_et0_batch(temps) * DAYS_PER_WEEK
+        base_deficit = et0_weekly - rainfall
+        
+        # Stress-zone and low-NDVI multipliers, only for fields with NDVI context
+        stress_pct /= 100
+        stress_factor = 1.0 + stress_pct @ STRESS_ZONE_WEIGHTS
+        ndvi_factor = NDVI_FACTORS[np.digitize(ndvi_mean, NDVI_FACTOR_THRESHOLDS)]
+        deficit = np.where(adjusted, base_deficit * stress_factor * ndvi_factor, base_deficit)
+        
+        # Ensure minimum realistic deficit
+        deficit = np.maximum(deficit, 10.0)
+        
+        status = DEFICIT_STATUS[np.digitize(deficit, DEFICIT_THRESHOLDS, right=True)].tolist()
+        
+        return [
+            {
+                'deficit_mm': round(float(deficit[i]), 1),
+                'status': status[i],
+                'et0_weekly': round(float(et0_weekly[i]), 1),
+                'rainfall': round(float(rainfall[i]), 1)
+            }
+            for i in range(n_fields)
+        ]
+    
+    def _water_deficit(self, weather, rainfall, ndvi_mean, zone_stats):
+        """
+        Combine weather, rainfall and NDVI stress into a deficit assessment.
+        
+        Args:
+            weather (dict): Weather data containing temperature
+            rainfall (float): Expected rainfall for the next 7 days in mm
+            ndvi_mean (float): Mean NDVI value of the field
+            zone_stats (dict): Statistics for each stress zone
+            
+        Returns:
+            dict: Water deficit assessment including status and mm
+        """
         # Calculate ET0 for 7 days
         et0_daily = self.calculate_et0(weather)
-        et0_weekly = et0_daily * 7
+        et0_weekly = et0_daily * DAYS_PER_WEEK
         
         # Calculate base deficit
         base_deficit = et0_weekly - rainfall
@@ -123,19 +657,16 @@ class WeatherService:
         # Adjust deficit based on NDVI stress (if provided)
         if ndvi_mean is not None and zone_stats is not None:
             # Higher stress zones need more water
-            critical_pct = zone_stats.get('Critical', {}).get('percentage', 0) / 100
-            high_pct = zone_stats.get('High', {}).get('percentage', 0) / 100
-            moderate_pct = zone_stats.get('Moderate', {}).get('percentage', 0) / 100
+            stress_pct = np.array([
+                zone_stats.get(name, {}).get('percentage', 0) for name in STRESS_ZONE_NAMES
+            ], dtype=np.float64) / 100
             
             # Increase deficit based on stress levels
-            stress_factor = 1.0 + (critical_pct * 0.8) + (high_pct * 0.5) + (moderate_pct * 0.2)
+            stress_factor = 1.0 + stress_pct @ STRESS_ZONE_WEIGHTS
             deficit = base_deficit * stress_factor
             
             # Also factor in low NDVI (more water needed)
-            if ndvi_mean < 0.3:
-                deficit = deficit * 1.5  # 50% more water needed for very low NDVI
-            elif ndvi_mean < 0.5:
-                deficit = deficit * 1.2  # 20% more water needed for low NDVI
+            deficit = float(deficit * NDVI_FACTORS[np.digitize(ndvi_mean, NDVI_FACTOR_THRESHOLDS)])
         else:
             deficit = base_deficit
         
@@ -143,12 +674,7 @@ class WeatherService:
         deficit = max(deficit, 10.0)  # Minimum 10mm deficit for agricultural fields
         
         # Determine status
-        if deficit > 40:
-            status = "High"
-        elif deficit > 25:
-            status = "Moderate"
-        else:
-            status = "Low"
+        status = str(DEFICIT_STATUS[np.digitize(deficit, DEFICIT_THRESHOLDS, right=True)])
         
         return {
             'deficit_mm': round(deficit, 1),
@@ -1,9 +1,14 @@
 import requests
 import json
+from requests.adapters import HTTPAdapter
+
+# Shared keep-alive session so repeated searches reuse the connection
+session = requests.Session()
+session.mount('http://', HTTPAdapter(pool_connections=1, pool_maxsize=4))
 
 # Test the farm search endpoint with a different registration number
 data = {'registration_number': 'FARM001'}
-response = requests.post('http://localhost:5000/api/farm-search', json=data)
+response = session.post('http://localhost:5000/api/farm-search', json=data)
 
 print(f"Status Code: {response.status_code}")
 result = response.json()